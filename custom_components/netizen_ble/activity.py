@@ -0,0 +1,146 @@
+"""Feed and fault events from feeder notifications, deduplicated and rate limited."""
+
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime
+from typing import Any
+
+from .const import DOMAIN, FAULT, FEED_STATE, MANUAL_FEED_RESULT, PLAN_FEED_RESULT
+
+EVENT_FEED = f"{DOMAIN}_feed"
+EVENT_FAULT = f"{DOMAIN}_fault"
+
+# Notification commands that can produce an event
+ACTIVITY_COMMANDS = frozenset(
+    int(cmd, 16) for cmd in (FEED_STATE, FAULT, PLAN_FEED_RESULT, MANUAL_FEED_RESULT)
+)
+# V2 models (DU-F14B, DU-CP01B) use 0x09 for battery and 0x0B for feed state, and send
+# no 0x0C feed reports, so only their faults are decoded
+V2_ACTIVITY_COMMANDS = frozenset((int(FAULT, 16),))
+# Events of one type per device allowed within RATE_WINDOW seconds; later ones are coalesced
+RATE_LIMIT = 5
+RATE_WINDOW = 60.0
+# Feed report records remembered to drop resent ones
+RECORD_MEMORY = 32
+# feed_state (0x09) status byte
+FEED_STATE_FEEDING = 1
+FEED_STATE_ERROR = 2
+
+
+def feed_record(record: bytes, command: int) -> dict[str, Any]:
+    """Decode one 9-byte feed report: yy mm dd HH MM SS portions type status."""
+    try:
+        fed_at: str | None = datetime(2000 + record[0], *record[1:6]).isoformat()
+    except ValueError:
+        fed_at = None
+    source = {1: "manual", 2: "plan"}.get(record[7])
+    if source is None:
+        source = "plan" if command == int(PLAN_FEED_RESULT, 16) else "manual"
+    return {
+        "type": "result",
+        "source": source,
+        "portions": record[6],
+        "success": record[8] == 0,
+        "fed_at": fed_at,
+    }
+
+
+class ActivityFilter:
+    """Turn one feeder's notification frames into feed and fault events.
+
+    Faults and the feeding flag are reported on change only, so the status poll
+    re-reading them fires nothing, and resent feed reports are dropped. Each event
+    type may fire RATE_LIMIT times per RATE_WINDOW; beyond that only the latest
+    event is held, with a count of the ones it replaced, until `flush` may send it.
+    """
+
+    def __init__(self, limit: int = RATE_LIMIT, window: float = RATE_WINDOW) -> None:
+        self._limit = limit
+        self._window = window
+        # Last reported fault code per source (0: no fault)
+        self._faults: dict[str, int] = {"fault": 0, "feed_state": 0}
+        self._feeding = False
+        self._records: deque[bytes] = deque(maxlen=RECORD_MEMORY)
+        self._sent: dict[str, deque[float]] = {EVENT_FEED: deque(), EVENT_FAULT: deque()}
+        self._held: dict[str, tuple[dict[str, Any], int]] = {}
+
+    def process(
+        self, frame: bytes, now: float, v2: bool = False
+    ) -> list[tuple[str, dict[str, Any]]]:
+        """Return the events a notification frame fires now (v2: V2 protocol model)."""
+        commands = V2_ACTIVITY_COMMANDS if v2 else ACTIVITY_COMMANDS
+        if len(frame) < 4 or frame[1] not in commands:
+            return []
+        payload = bytes(frame[3 : 3 + frame[2]])
+        return [
+            event
+            for event_type, data in self._decode(frame[1], payload)
+            if (event := self._admit(event_type, data, now))
+        ]
+
+    def flush(self, now: float) -> list[tuple[str, dict[str, Any]]]:
+        """Return held events whose type has room in the rate window again."""
+        events = []
+        for event_type in list(self._held):
+            if self._has_room(event_type, now):
+                data, suppressed = self._held.pop(event_type)
+                self._sent[event_type].append(now)
+                events.append((event_type, {**data, "suppressed": suppressed}))
+        return events
+
+    def next_flush(self) -> float | None:
+        """Time at which `flush` can send a held event, or None if nothing is held."""
+        if not self._held:
+            return None
+        return min(self._sent[event_type][0] + self._window for event_type in self._held)
+
+    def _decode(self, command: int, payload: bytes) -> list[tuple[str, dict[str, Any]]]:
+        if not payload:
+            return []
+        if command == int(FAULT, 16):
+            return self._fault_change("fault", payload[0])
+        if command == int(FEED_STATE, 16):
+            status = payload[0]
+            events = self._fault_change("feed_state", status if status == FEED_STATE_ERROR else 0)
+            feeding = status == FEED_STATE_FEEDING
+            if feeding and not self._feeding:
+                events.append((EVENT_FEED, {"type": "dispensing"}))
+            self._feeding = feeding
+            return events
+        events = []
+        for offset in range(0, len(payload) - 8, 9):
+            record = payload[offset : offset + 9]
+            if record in self._records:
+                continue
+            self._records.append(record)
+            events.append((EVENT_FEED, feed_record(record, command)))
+        return events
+
+    def _fault_change(self, source: str, code: int) -> list[tuple[str, dict[str, Any]]]:
+        previous = self._faults[source]
+        if code == previous:
+            return []
+        self._faults[source] = code
+        return [
+            (
+                EVENT_FAULT,
+                {"source": source, "fault_code": code or previous, "active": code != 0},
+            )
+        ]
+
+    def _has_room(self, event_type: str, now: float) -> bool:
+        sent = self._sent[event_type]
+        while sent and sent[0] + self._window <= now:
+            sent.popleft()
+        return len(sent) < self._limit
+
+    def _admit(
+        self, event_type: str, data: dict[str, Any], now: float
+    ) -> tuple[str, dict[str, Any]] | None:
+        if event_type not in self._held and self._has_room(event_type, now):
+            self._sent[event_type].append(now)
+            return event_type, {**data, "suppressed": 0}
+        _, replaced = self._held.get(event_type, (None, -1))
+        self._held[event_type] = (data, replaced + 1)
+        return None
@@ -0,0 +1,51 @@
+"""Battery discharge trend and low-battery forecast from sparse level readings."""
+
+from __future__ import annotations
+
+from collections import deque
+
+# Level (%) the forecast counts down to
+LOW_BATTERY = 20
+# Readings older than this do not shape the trend (seconds)
+TREND_WINDOW = 7 * 24 * 3600
+# Span of readings needed before forecasting (seconds)
+MIN_TREND_SPAN = 3600
+MAX_SAMPLES = 64
+
+
+class BatteryTrend:
+    """Keep battery readings where the level changed and fit a discharge rate."""
+
+    def __init__(self) -> None:
+        self._samples: deque[tuple[float, int]] = deque(maxlen=MAX_SAMPLES)
+
+    def add(self, level: int, when: float) -> bool:
+        """Record a reading; return True if it changed the trend."""
+        if self._samples and self._samples[-1][1] == level:
+            return False
+        if self._samples and level > self._samples[-1][1]:
+            # Charged or batteries swapped: the old discharge curve no longer applies
+            self._samples.clear()
+        self._samples.append((when, level))
+        while self._samples and self._samples[0][0] < when - TREND_WINDOW:
+            self._samples.popleft()
+        return True
+
+    def forecast(self, threshold: int = LOW_BATTERY) -> float | None:
+        """Return the epoch time the level is expected to reach threshold, if discharging."""
+        if len(self._samples) < 2:
+            return None
+        first, last = self._samples[0], self._samples[-1]
+        if last[0] - first[0] < MIN_TREND_SPAN:
+            return None
+        if last[1] <= threshold:
+            return last[0]
+        # Least-squares slope in %/s
+        n = len(self._samples)
+        mean_t = sum(t for t, _ in self._samples) / n
+        mean_l = sum(level for _, level in self._samples) / n
+        var = sum((t - mean_t) ** 2 for t, _ in self._samples)
+        slope = sum((t - mean_t) * (level - mean_l) for t, level in self._samples) / var
+        if slope >= 0:
+            return None
+        return last[0] + (last[1] - threshold) / -slope
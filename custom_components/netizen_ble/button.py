@@ -9,10 +9,10 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
 from .coordinator import NetizenBLECoordinator
+from .entity import NetizenBLEEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -53,7 +53,7 @@ async def async_setup_entry(
     async_add_entities(entities)
 
 
-class NetizenBLEButton(CoordinatorEntity[NetizenBLECoordinator], ButtonEntity):
+class NetizenBLEButton(NetizenBLEEntity, ButtonEntity):
     """Netizen BLE button (feed now / refresh schedule)."""
 
     def __init__(
@@ -62,21 +62,12 @@ class NetizenBLEButton(CoordinatorEntity[NetizenBLECoordinator], ButtonEntity):
         device_info: DeviceInfo,
         description: ButtonEntityDescription,
     ) -> None:
-        super().__init__(coordinator)
-        self._device = coordinator.device
-        self._attr_device_info = device_info
-        self.entity_description = description
-        self._attr_unique_id = f"{self._device.address}_{description.key}"
-        self._attr_has_entity_name = True
-
-    @property
-    def available(self) -> bool:
-        return self.coordinator.connected
+        super().__init__(coordinator, device_info, description)
+        self._queues_commands = description.key == "feed_now"
 
     async def async_press(self) -> None:
         if self.entity_description.key == "feed_now":
-            portions = getattr(self.coordinator, "_feed_portions", 1) or 1
-            await self._device.trigger_feed(portions=portions)
+            await self.coordinator.async_feed(self.coordinator.feed_portions)
         elif self.entity_description.key == "query_feed_plan":
             await self._device.query_feed_plan()
         elif self.entity_description.key == "sync_time":
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Mapping
 from typing import Any
 
 import voluptuous as vol
@@ -12,7 +13,22 @@ from homeassistant.const import CONF_ADDRESS
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers import selector
 
-from .const import CONF_DEVICE_TYPE, DOMAIN, SERVICE_UUIDS, SUPPORTED_BLE_NAME_PREFIXES
+from .const import (
+    CONF_DEVICE_TYPE,
+    CONF_VERIFICATION_CODE,
+    DEFAULT_VERIFICATION_CODE,
+    DOMAIN,
+    SERVICE_UUIDS,
+    SUPPORTED_BLE_NAME_PREFIXES,
+)
+from .session import (
+    CannotConnect,
+    InvalidAuth,
+    async_load_backend,
+    async_open_session,
+    async_store_session,
+    normalize_address,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -49,6 +65,42 @@ class NetizenBLEConfigFlow(ConfigFlow, domain=DOMAIN):
         self._discovery: BluetoothServiceInfoBleak | None = None
         self._discovered: list[tuple[str, str, str]] = []  # (address, name, device_type)
 
+    async def _async_validate(
+        self, address: str, verification_code: str, device_type: str | None, title: str
+    ) -> dict[str, str]:
+        """Connect with the given code; keep the session for entry setup. Return form errors."""
+        try:
+            device = await async_open_session(
+                self.hass, address, verification_code, device_type, title
+            )
+        except InvalidAuth:
+            return {CONF_VERIFICATION_CODE: "invalid_auth"}
+        except CannotConnect as err:
+            _LOGGER.debug("Validation connect failed: %s", err)
+            return {"base": "cannot_connect"}
+        async_store_session(self.hass, device)
+        return {}
+
+    def _async_show_discover_form(self, errors: dict[str, str] | None = None) -> FlowResult:
+        return self.async_show_form(
+            step_id="discover",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_ADDRESS): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=[
+                                selector.SelectOptionDict(value=addr, label=f"{name} ({addr})")
+                                for addr, name, _ in self._discovered
+                            ],
+                            mode=selector.SelectSelectorMode.LIST,
+                        )
+                    ),
+                    vol.Optional("verification_code", default="00000000"): str,
+                }
+            ),
+            errors=errors,
+        )
+
     async def async_step_bluetooth(self, discovery_info: BluetoothServiceInfoBleak) -> FlowResult:
         """Handle Bluetooth discovery."""
         await self.async_set_unique_id(discovery_info.address)
@@ -99,11 +151,17 @@ class NetizenBLEConfigFlow(ConfigFlow, domain=DOMAIN):
                 data: dict[str, Any] = {CONF_ADDRESS: addr}
                 if user_input.get("verification_code"):
                     data["verification_code"] = user_input["verification_code"].strip()
-                return self.async_create_entry(
-                    title=user_input.get("name") or f"Netizen {addr[-8:].replace(':', '')}",
-                    data=data,
+                title = user_input.get("name") or f"Netizen {addr[-8:].replace(':', '')}"
+                errors = await self._async_validate(
+                    addr,
+                    data.get("verification_code") or DEFAULT_VERIFICATION_CODE,
+                    None,
+                    title,
                 )
-            errors["base"] = "invalid_address"
+                if not errors:
+                    return self.async_create_entry(title=title, data=data)
+            else:
+                errors["base"] = "invalid_address"
 
         return self.async_show_form(
             step_id="manual",
@@ -124,6 +182,7 @@ class NetizenBLEConfigFlow(ConfigFlow, domain=DOMAIN):
 
     async def async_step_discover(self, user_input: dict[str, Any] | None = None) -> FlowResult:
         """Run BLE scan and let user pick a feeder (library discover_feeders)."""
+        await async_load_backend(self.hass)
         from petnetizen_feeder import discover_feeders
 
         # Run or re-run discovery when first entering or when retrying after no devices found
@@ -145,67 +204,16 @@ class NetizenBLEConfigFlow(ConfigFlow, domain=DOMAIN):
                     data_schema=vol.Schema({vol.Optional("retry", default=True): bool}),
                     errors={"base": "no_devices_found"},
                 )
-            options = [
-                selector.SelectOptionDict(value=addr, label=f"{name} ({addr})")
-                for addr, name, _ in self._discovered
-            ]
-            return self.async_show_form(
-                step_id="discover",
-                data_schema=vol.Schema(
-                    {
-                        vol.Required(CONF_ADDRESS): selector.SelectSelector(
-                            selector.SelectSelectorConfig(
-                                options=options,
-                                mode=selector.SelectSelectorMode.LIST,
-                            )
-                        ),
-                        vol.Optional("verification_code", default="00000000"): str,
-                    }
-                ),
-            )
+            return self._async_show_discover_form()
 
         if user_input is None:
-            options = [
-                selector.SelectOptionDict(value=addr, label=f"{name} ({addr})")
-                for addr, name, _ in self._discovered
-            ]
-            return self.async_show_form(
-                step_id="discover",
-                data_schema=vol.Schema(
-                    {
-                        vol.Required(CONF_ADDRESS): selector.SelectSelector(
-                            selector.SelectSelectorConfig(
-                                options=options,
-                                mode=selector.SelectSelectorMode.LIST,
-                            )
-                        ),
-                        vol.Optional("verification_code", default="00000000"): str,
-                    }
-                ),
-            )
+            return self._async_show_discover_form()
 
         addr = (user_input.get(CONF_ADDRESS) or "").strip()
         verification_code = (user_input.get("verification_code") or "00000000").strip()
         selected = next((t for t in self._discovered if t[0] == addr), None)
         if not selected:
-            return self.async_show_form(
-                step_id="discover",
-                data_schema=vol.Schema(
-                    {
-                        vol.Required(CONF_ADDRESS): selector.SelectSelector(
-                            selector.SelectSelectorConfig(
-                                options=[
-                                    selector.SelectOptionDict(value=a, label=f"{n} ({a})")
-                                    for a, n, _ in self._discovered
-                                ],
-                                mode=selector.SelectSelectorMode.LIST,
-                            )
-                        ),
-                        vol.Optional("verification_code", default="00000000"): str,
-                    }
-                ),
-                errors={"base": "invalid_selection"},
-            )
+            return self._async_show_discover_form({"base": "invalid_selection"})
         _addr, name, device_type = selected
         await self.async_set_unique_id(addr)
         self._abort_if_unique_id_configured()
@@ -215,30 +223,82 @@ class NetizenBLEConfigFlow(ConfigFlow, domain=DOMAIN):
         }
         if verification_code:
             data["verification_code"] = verification_code
-        return self.async_create_entry(
-            title=name or f"Netizen {addr[-8:].replace(':', '')}",
-            data=data,
-        )
+        title = name or f"Netizen {addr[-8:].replace(':', '')}"
+        if errors := await self._async_validate(addr, verification_code, device_type, title):
+            return self._async_show_discover_form(errors)
+        return self.async_create_entry(title=title, data=data)
 
     async def async_step_confirm(self, user_input: dict[str, Any] | None = None) -> FlowResult:
         """Confirm discovered device (Bluetooth)."""
         if not self._discovery:
             return self.async_abort(reason="no_discovery")
+        name = self._discovery.name or self._discovery.address
         if user_input is not None:
             device_type = _detect_device_type_from_name(self._discovery.name)
-            data: dict[str, Any] = {
-                CONF_ADDRESS: self._discovery.address,
-                CONF_DEVICE_TYPE: device_type,
-            }
-            return self.async_create_entry(
-                title=self._discovery.name or self._discovery.address,
-                data=data,
+            verification_code = (
+                user_input.get(CONF_VERIFICATION_CODE) or DEFAULT_VERIFICATION_CODE
+            ).strip()
+            errors = await self._async_validate(
+                self._discovery.address, verification_code, device_type, name
+            )
+            if not errors:
+                data: dict[str, Any] = {
+                    CONF_ADDRESS: self._discovery.address,
+                    CONF_DEVICE_TYPE: device_type,
+                }
+                if verification_code != DEFAULT_VERIFICATION_CODE:
+                    data[CONF_VERIFICATION_CODE] = verification_code
+                return self.async_create_entry(title=name, data=data)
+            # Let the user enter a custom verification code and retry
+            return self.async_show_form(
+                step_id="confirm",
+                data_schema=vol.Schema(
+                    {vol.Optional(CONF_VERIFICATION_CODE, default=verification_code): str}
+                ),
+                errors=errors,
+                description_placeholders={"name": name},
             )
         self._set_confirm_only()
         return self.async_show_form(
             step_id="confirm",
             data_schema=vol.Schema({}),
-            description_placeholders={"name": self._discovery.name or self._discovery.address},
+            description_placeholders={"name": name},
+        )
+
+    async def async_step_reauth(self, entry_data: Mapping[str, Any]) -> FlowResult:
+        """Feeder rejected the stored verification code."""
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Ask for a new verification code and validate it before reloading the entry."""
+        entry = self._get_reauth_entry()
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            verification_code = user_input[CONF_VERIFICATION_CODE].strip()
+            errors = await self._async_validate(
+                normalize_address(entry.data[CONF_ADDRESS]),
+                verification_code,
+                entry.data.get(CONF_DEVICE_TYPE),
+                entry.title,
+            )
+            if not errors:
+                return self.async_update_reload_and_abort(
+                    entry, data_updates={CONF_VERIFICATION_CODE: verification_code}
+                )
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_VERIFICATION_CODE,
+                        default=entry.data.get(CONF_VERIFICATION_CODE, DEFAULT_VERIFICATION_CODE),
+                    ): str
+                }
+            ),
+            errors=errors,
+            description_placeholders={"name": entry.title},
         )
 
     async def async_step_import(self, import_data: dict[str, Any]) -> FlowResult:
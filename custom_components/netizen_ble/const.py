@@ -19,3 +19,47 @@ DEFAULT_VERIFICATION_CODE = "00000000"
 
 # Name prefixes for discovery (aligned with petnetizen_feeder FEEDER_NAME_PREFIXES)
 SUPPORTED_BLE_NAME_PREFIXES = ("Du", "JK", "ALI", "PET", "FEED")
+
+# Concurrent feed writes per Bluetooth adapter / proxy for the feed_group service
+ADAPTER_FEED_CONCURRENCY = 3
+
+# hass.data key for sessions validated by the config flow, awaiting entry setup
+DATA_SESSIONS = f"{DOMAIN}_sessions"
+# hass.data key for the fleet totals shared by all entries
+DATA_FLEET = f"{DOMAIN}_fleet"
+# hass.data key for the device registry id -> coordinator index used by services
+DATA_DEVICES = f"{DOMAIN}_devices"
+# Seconds a validated config flow session waits for entry setup to claim it
+SESSION_HANDOFF_TIMEOUT = 60
+
+# Models on the V2 protocol, where 0x09 is the battery report and 0x0B feed state
+V2_MODELS = ("DU-F14B", "DU-CP01B")
+
+# Data points read from notifications during the status poll
+FEED_STATE = "09"
+POWER_MODE = "0E"  # 0 battery, 1 DC
+# Their V2 counterparts: power mode coded as 0x0E, battery level in byte 5
+V2_POWER_MODE = "08"
+V2_BATTERY = "09"
+
+# Notifications turned into feed / fault events
+FAULT = "0A"
+PLAN_FEED_RESULT = "0B"
+MANUAL_FEED_RESULT = "0C"
+
+# Settings written by apply_settings profiles
+LED_CTRL = "0F"
+AUTO_LOCK = "10"
+MOOD_LIGHT = "13"
+DND = "18"  # enabled, start hh, start mm, end hh, end mm
+LONG_RING = "19"
+
+# DU-PD01 (snack dispenser) model name and data points
+PD01_MODEL = "DU-PD01"
+PD01_TRAIN_COUNT = "40"
+PD01_TRAIN = "41"
+
+# Du-TC02 (laser toy) model name and data points written through the control stream
+TC02_MODEL = "Du-TC02"
+TC02_COLOR_RGB = "52"
+TC02_JOYSTICK = "58"
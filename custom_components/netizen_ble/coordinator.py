@@ -4,20 +4,37 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
+from collections.abc import Iterable, Mapping
 from datetime import timedelta
 from typing import Any
 
+from homeassistant.components.bluetooth import BluetoothChange, BluetoothServiceInfoBleak
 from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
+from .activity import ActivityFilter
+from .const import PD01_MODEL
 from .device import NetizenBLEDevice
+from .outbox import NetizenBLEOutbox
+from .schedule import FeedSlot
+from .settings import SettingsProfile
+from .training import TrainingPlan, TrainingSession
+from .verify import FeedVerifier
 
 _LOGGER = logging.getLogger(__name__)
 
 POLL_INTERVAL = timedelta(seconds=60)
+# Feeders running on batteries: fewer polls save their power and our airtime
+BATTERY_POLL_INTERVAL = timedelta(minutes=10)
+# Minimum seconds between advertisement-triggered outbox flush attempts
+FLUSH_RETRY_INTERVAL = 30.0
+# Device notifications within this many seconds reach entities as one update
+STATE_PUSH_DELAY = 0.1
 
 
-class NetizenBLECoordinator(DataUpdateCoordinator[dict[str, Any]]):
+class NetizenBLECoordinator(DataUpdateCoordinator[Mapping[str, Any]]):
     """Coordinator for Netizen BLE device state."""
 
     def __init__(self, hass: HomeAssistant, device: NetizenBLEDevice) -> None:
@@ -30,34 +47,194 @@ class NetizenBLECoordinator(DataUpdateCoordinator[dict[str, Any]]):
         self._device = device
         self._unsub: CALLBACK_TYPE | None = None
         self._unsub = device.subscribe(self._on_device_state)
-        self._feed_portions = 1  # default portions for Feed now button
+        self._feed_portions = 1
+        self._outbox = NetizenBLEOutbox(hass, device)
+        self._last_flush_attempt = 0.0
+        self._pending_state: Mapping[str, Any] | None = None
+        self._push_handle: asyncio.TimerHandle | None = None
+        self._training: TrainingSession | None = None
+        # Device registry id included in events; set once the entry registered the device
+        self.device_id: str | None = None
+        self._activity = ActivityFilter()
+        self._activity_handle: asyncio.TimerHandle | None = None
+        self._unsub_frames = device.subscribe_frames(self._on_frame)
+        self._verifier = FeedVerifier(hass, device, self._fire)
 
     @property
     def device(self) -> NetizenBLEDevice:
         return self._device
 
+    @property
+    def outbox(self) -> NetizenBLEOutbox:
+        return self._outbox
+
+    @property
+    def feed_portions(self) -> int:
+        """Portions for Feed now and feed_group, set by the Portions number entity."""
+        return self._feed_portions
+
+    @feed_portions.setter
+    def feed_portions(self, portions: int) -> None:
+        self._feed_portions = portions
+
+    async def async_feed(self, portions: int) -> bool:
+        return await self._outbox.async_send("feed", portions=portions)
+
+    async def async_set_feed_plan(self, slots: Iterable[FeedSlot | dict]) -> bool:
+        plan = [FeedSlot.from_dict(slot).as_dict() for slot in slots]
+        return await self._outbox.async_send("set_feed_plan", slots=plan)
+
+    async def async_set_child_lock(self, locked: bool) -> bool:
+        return await self._outbox.async_send("set_child_lock", locked=locked)
+
+    async def async_set_prompt_sound(self, on: bool) -> bool:
+        return await self._outbox.async_send("set_prompt_sound", on=on)
+
+    async def async_apply_settings(self, profile: SettingsProfile) -> bool:
+        return await self._outbox.async_send("apply_settings", settings=profile.as_dict())
+
+    @property
+    def training(self) -> TrainingSession | None:
+        return self._training
+
+    @callback
+    def async_start_training(self, plan: TrainingPlan) -> TrainingSession:
+        """Claim the feeder for a training session; raise if one cannot start now.
+
+        Polling pauses from here until async_run_training returns.
+        """
+        if self._training is not None:
+            raise HomeAssistantError(
+                f"A training session is already running on {self._device.name}"
+            )
+        if not self._device.is_connected:
+            raise HomeAssistantError(f"{self._device.name} is not connected")
+        if not self._device.is_model(PD01_MODEL):
+            raise ServiceValidationError(f"{self._device.name} is not a {PD01_MODEL}")
+        self._training = TrainingSession(self._device, plan)
+        return self._training
+
+    async def async_run_training(self, session: TrainingSession) -> dict[str, Any]:
+        """Run a session from async_start_training to its end and return its summary."""
+        try:
+            return await session.async_run()
+        finally:
+            if self._training is session:
+                self._training = None
+
+    @callback
+    def async_stop_training(self) -> bool:
+        if self._training is None:
+            return False
+        self._training.stop()
+        return True
+
+    @callback
+    def async_handle_advertisement(
+        self, _service_info: BluetoothServiceInfoBleak, _change: BluetoothChange
+    ) -> None:
+        """Feeder advertised: it is back in range, so flush anything queued for it."""
+        if not self._outbox.pending or self._outbox.flushing:
+            return
+        now = time.monotonic()
+        if now - self._last_flush_attempt < FLUSH_RETRY_INTERVAL:
+            return
+        self._last_flush_attempt = now
+        self.hass.async_create_task(self._async_flush_outbox())
+
+    async def _async_flush_outbox(self) -> None:
+        if await self._outbox.async_flush():
+            await self.async_request_refresh()
+
     @property
     def connected(self) -> bool:
         return self._device.is_connected
 
     @callback
-    def _on_device_state(self, state: dict[str, Any]) -> None:
-        self.async_set_updated_data(state)
+    def _on_device_state(self, state: Mapping[str, Any]) -> None:
+        """Queue the latest device state; a burst of notifications is pushed once."""
+        self._verifier.async_update_plan(state.get("feed_plan"))
+        self._pending_state = state
+        if self._push_handle is None:
+            self._push_handle = self.hass.loop.call_later(STATE_PUSH_DELAY, self._push_state)
+
+    @callback
+    def _push_state(self) -> None:
+        if self._push_handle:
+            self._push_handle.cancel()
+            self._push_handle = None
+        state, self._pending_state = self._pending_state, None
+        if state is not None:
+            self.async_set_updated_data(state)
+
+    @callback
+    def _on_frame(self, frame: bytes) -> None:
+        """Fire feed / fault events for a notification as soon as it arrives."""
+        self._fire_activity(
+            self._activity.process(frame, self.hass.loop.time(), self._device.v2_protocol)
+        )
 
-    async def _async_update_data(self) -> dict[str, Any]:
+    @callback
+    def _flush_activity(self, when: float) -> None:
+        self._activity_handle = None
+        # The loop may run a timer slightly early; it stands for its scheduled time
+        self._fire_activity(self._activity.flush(max(when, self.hass.loop.time())))
+
+    @callback
+    def _fire(self, event_type: str, data: dict[str, Any]) -> None:
+        self.hass.bus.async_fire(
+            event_type,
+            {
+                "device_id": self.device_id,
+                "address": self._device.address,
+                "name": self._device.name,
+                **data,
+            },
+        )
+
+    @callback
+    def _fire_activity(self, events: list[tuple[str, dict[str, Any]]]) -> None:
+        for event_type, data in events:
+            self._fire(event_type, data)
+        if self._activity_handle is None and (when := self._activity.next_flush()) is not None:
+            # Send the coalesced event once the rate window has room again
+            self._activity_handle = self.hass.loop.call_at(when, self._flush_activity, when)
+
+    async def _async_update_data(self) -> Mapping[str, Any]:
         """Poll device for status."""
+        if self._training is not None:
+            # Keep the link to the reward frames; state is read when the session ends
+            return self.data or {}
         try:
             await self._device.query_status()
         except Exception as e:
             _LOGGER.debug("Netizen query_status failed: %s", e)
+        if self._outbox.pending and self._device.is_connected:
+            await self._outbox.async_flush()
+        self.update_interval = (
+            BATTERY_POLL_INTERVAL
+            if self._device.get_state("power_mode") == "battery"
+            else POLL_INTERVAL
+        )
         await asyncio.sleep(1.0)
-        # Return merged state (device state + optimistic) so switch/sensor stay in sync
-        state = getattr(self._device, "_state", {})
-        optimistic = getattr(self._device, "_optimistic", {})
-        return {**state, **optimistic}
+        # The poll result supersedes notifications still waiting to be pushed
+        self._pending_state = None
+        # The device's live view (state + optimistic) so switch/sensor stay in sync
+        return self._device.state
 
     async def async_unload(self) -> None:
         if self._unsub:
             self._unsub()
             self._unsub = None
+        self._unsub_frames()
+        self._verifier.async_stop()
+        if self._training is not None:
+            # No more rewards once the entry is gone; the session ends at its next wait
+            self._training.stop()
+        if self._activity_handle:
+            self._activity_handle.cancel()
+            self._activity_handle = None
+        if self._push_handle:
+            self._push_handle.cancel()
+            self._push_handle = None
         await self._device.disconnect()
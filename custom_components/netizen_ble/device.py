@@ -4,16 +4,71 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from collections.abc import Callable
+import time
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from datetime import date
 from typing import Any
 
-from petnetizen_feeder import FeederDevice as LibraryFeederDevice
-from petnetizen_feeder import FeedSchedule, Weekday
+from homeassistant.util import dt as dt_util
 
-from .const import DEFAULT_VERIFICATION_CODE
+from .battery import BatteryTrend
+from .const import (
+    DEFAULT_VERIFICATION_CODE,
+    FEED_STATE,
+    PD01_TRAIN,
+    PD01_TRAIN_COUNT,
+    POWER_MODE,
+    TC02_COLOR_RGB,
+    TC02_JOYSTICK,
+    TC02_MODEL,
+    V2_BATTERY,
+    V2_MODELS,
+    V2_POWER_MODE,
+)
+from .schedule import FeedPlan, FeedSlot, parse_plan
+from .settings import SETTING_COMMANDS, SettingsProfile, setting_payload
+from .state import DeviceState, StateView
+from .stream import ControlStream
 
 _LOGGER = logging.getLogger(__name__)
 
+# DU-PD01 train payload for one reward: status=1, time=6 min, times=1
+TRAIN_REWARD = bytes((1, 6, 1))
+# Seconds to wait for a reply to a raw query frame
+REPLY_TIMEOUT = 3.0
+
+
+@dataclass(slots=True)
+class CommandStats:
+    """Command outcomes for the current local day; cleared by the first command of a new day."""
+
+    day: date | None = None
+    commands: int = 0
+    failures: int = 0
+    feeds: int = 0
+    latency_total: float = 0.0
+
+    def _roll(self) -> None:
+        if (today := dt_util.now().date()) != self.day:
+            self.day = today
+            self.commands = self.failures = self.feeds = 0
+            self.latency_total = 0.0
+
+    def record(self, ok: bool, latency: float, feed: bool = False) -> None:
+        self._roll()
+        self.commands += 1
+        self.latency_total += latency
+        if not ok:
+            self.failures += 1
+        elif feed:
+            self.feeds += 1
+
+    def record_feed(self) -> None:
+        """Count a feed the feeder made on its own schedule; no command was sent for it."""
+        self._roll()
+        self.feeds += 1
+
 
 class NetizenBLEDevice:
     """Wrapper around petnetizen_feeder FeederDevice for Home Assistant."""
@@ -30,16 +85,36 @@ class NetizenBLEDevice:
             else ":".join(address[i : i + 2] for i in range(0, min(12, len(address)), 2))
         )
         self._verification_code = verification_code or DEFAULT_VERIFICATION_CODE
+        # Imported on first use so loading the integration does not pull in the BLE stack
+        from petnetizen_feeder import FeederDevice as LibraryFeederDevice
+
         self._device = LibraryFeederDevice(
             self._address,
             self._verification_code,
             device_type=device_type,
         )
-        self._state: dict[str, Any] = {}
-        self._listeners: list[Callable[[dict[str, Any]], None]] = []
+        self._state = DeviceState()
+        self._listeners: list[Callable[[Mapping[str, Any]], None]] = []
+        self._frame_listeners: list[Callable[[bytes], None]] = []
+        self._tap_notifications()
+        # Held around every library call and raw write / reply wait: replies are
+        # matched by scanning received_data, so operations must not interleave
         self._lock = asyncio.Lock()
         # Optimistic state before device is queried (query_status fetches child_lock/prompt_sound)
         self._optimistic: dict[str, Any] = {}
+        self._view = StateView(self._state, self._optimistic)
+        self._auth_failed = False
+        self._stats = CommandStats()
+        # Index of the first library notification not yet scanned for battery/power
+        self._scan_cursor = 0
+        self._battery = BatteryTrend()
+        self._stream = ControlStream(self._address, self._write_stream_frame)
+        # Whether the write characteristic needs acknowledged writes (None: not checked yet)
+        self._write_response: bool | None = None
+        # Whether the link was up when last seen; cached settings go when it drops
+        self._linked = False
+        # Settings keys sent by the last apply_settings call, in send order
+        self._settings_written: tuple[str, ...] = ()
 
     @property
     def address(self) -> str:
@@ -49,27 +124,54 @@ class NetizenBLEDevice:
     def is_connected(self) -> bool:
         return self._device.is_connected
 
+    @property
+    def auth_failed(self) -> bool:
+        """True if the last connect was refused because of the verification code."""
+        return self._auth_failed
+
+    @property
+    def stats(self) -> CommandStats:
+        """Today's acknowledged feeds, command failures and latency."""
+        return self._stats
+
     @property
     def name(self) -> str:
-        return self._state.get("device_name") or self._address
+        return self._state.device_name or self._address
+
+    def is_model(self, model: str) -> bool:
+        """True if the name the feeder reported contains `model` (unknown until connected)."""
+        name = self._state.device_name
+        return name is not None and model.upper() in name.upper()
+
+    @property
+    def settings_written(self) -> tuple[str, ...]:
+        """Settings the last apply_settings call actually sent to the feeder."""
+        return self._settings_written
+
+    @property
+    def v2_protocol(self) -> bool:
+        """True for V2 protocol models, whose data points differ from standard feeders."""
+        return any(self.is_model(model) for model in V2_MODELS)
+
+    @property
+    def state(self) -> StateView:
+        """Live read-only view of the device state (optimistic values included)."""
+        return self._view
 
     def set_ble_device(self, _ble_device: Any) -> None:
         """No-op: library uses address only."""
 
     def get_state(self, key: str, default: Any = None) -> Any:
-        if key in self._optimistic:
-            return self._optimistic[key]
-        return self._state.get(key, default)
+        return self._view.get(key, default)
 
     def _notify_listeners(self) -> None:
-        state = {**self._state, **self._optimistic}
         for cb in self._listeners:
             try:
-                cb(state.copy())
+                cb(self._view)
             except Exception:
                 pass
 
-    def subscribe(self, callback: Callable[[dict[str, Any]], None]) -> Callable[[], None]:
+    def subscribe(self, callback: Callable[[Mapping[str, Any]], None]) -> Callable[[], None]:
         self._listeners.append(callback)
 
         def unsubscribe() -> None:
@@ -78,115 +180,276 @@ class NetizenBLEDevice:
 
         return unsubscribe
 
+    def subscribe_frames(self, callback: Callable[[bytes], None]) -> Callable[[], None]:
+        """Receive every raw notification frame as it arrives."""
+        self._frame_listeners.append(callback)
+
+        def unsubscribe() -> None:
+            if callback in self._frame_listeners:
+                self._frame_listeners.remove(callback)
+
+        return unsubscribe
+
+    def _tap_notifications(self) -> None:
+        """Wrap the library's notification handler so frames reach frame listeners.
+
+        The library looks the handler up when it enables notifications on connect,
+        so the wrapper installed here is the one registered with the BLE client.
+        """
+        protocol = self._device._protocol  # noqa: SLF001
+        library_handler = protocol.notification_handler
+
+        def _handler(sender: Any, data: bytearray) -> None:
+            library_handler(sender, data)
+            for cb in self._frame_listeners:
+                try:
+                    cb(bytes(data))
+                except Exception:
+                    _LOGGER.exception("Error handling notification from %s", self._address)
+
+        protocol.notification_handler = _handler
+
     async def connect(self, ble_client: Any = None) -> bool:
+        self._auth_failed = False
+        self._write_response = None
+        self._check_link()
         try:
-            ok = await self._device.connect(ble_client=ble_client)
-            if ok:
-                await self._fetch_device_info()
-                await self.query_status()
-            return ok
+            async with self._lock:
+                ok = await self._device.connect(ble_client=ble_client)
+            self._linked = ok
+            if ok and self._verification_rejected():
+                _LOGGER.warning("Feeder %s rejected the verification code", self._address)
+                self._auth_failed = True
+                await self.disconnect()
+                return False
+            if not ok:
+                # The library may fail after the link came up (e.g. on a passed-in client)
+                await self.disconnect()
+                return False
+            await self._fetch_device_info()
+            await self.query_status()
+            return True
         except Exception as e:
             _LOGGER.warning("Netizen BLE connect error: %s", e)
+            await self.disconnect()
             return False
 
+    def _check_link(self) -> None:
+        """Forget the cached settings once the link has dropped.
+
+        The feeder may be reset or changed from the app while out of reach, so
+        apply_settings must not skip a setting on the strength of an old write.
+        """
+        if self._linked and not self.is_connected:
+            self._linked = False
+            for key in SETTING_COMMANDS:
+                setattr(self._state, key, None)
+
+    async def ensure_connected(self) -> bool:
+        """Reconnect if the link dropped; return True when connected."""
+        if self.is_connected:
+            return True
+        _LOGGER.debug("Reconnecting to %s", self._address)
+        return await self.connect()
+
+    async def keep_alive(self) -> bool:
+        """Keep an idle link from timing out: reconnect if needed, else send a cheap query.
+
+        The power mode reply is picked up by the next status scan like any other.
+        """
+        if not self.is_connected:
+            return await self.ensure_connected()
+        try:
+            async with self._lock:
+                await self._write_frame(self._encode(POWER_MODE, b""))
+        except Exception as e:
+            _LOGGER.debug("Keep-alive to %s failed: %s", self._address, e)
+            return False
+        return True
+
+    def _verification_rejected(self) -> bool:
+        """Check the feeder's answer to the verification code sent on connect.
+
+        Firmwares that do not answer (or answer before notifications are enabled)
+        are treated as accepted.
+        """
+        protocol = self._device._protocol  # noqa: SLF001
+        for data in protocol.received_data:
+            decoded = protocol.decode_notification(data)
+            if decoded.get("command") == "06" and "verification_success" in decoded:
+                return not decoded["verification_success"]
+        return False
+
     async def _fetch_device_info(self) -> None:
         """Query device name and firmware version from feeder."""
         try:
-            info = await self._device.get_device_info()
+            async with self._lock:
+                info = await self._device.get_device_info()
             if info.get("device_name"):
-                self._state["device_name"] = info["device_name"]
+                self._state.device_name = info["device_name"]
             if info.get("device_version"):
-                self._state["device_version"] = info["device_version"]
+                self._state.device_version = info["device_version"]
             self._notify_listeners()
         except Exception as e:
             _LOGGER.debug("get_device_info failed: %s", e)
 
+    def record_scheduled_feed(self) -> None:
+        """Count a scheduled feed the feeder reported as done in today's feeds."""
+        self._stats.record_feed()
+        self._notify_listeners()
+
+    def _record(self, ok: bool, started: float, feed: bool = False) -> None:
+        """Count a command outcome and let listeners (coordinator, fleet totals) know."""
+        self._stats.record(ok, time.monotonic() - started, feed)
+        self._notify_listeners()
+
     async def sync_time(self) -> bool:
         """Sync feeder clock with host time."""
+        started = time.monotonic()
         try:
-            await self._device.sync_time()
-            return True
+            async with self._lock:
+                await self._device.sync_time()
+            ok = True
         except Exception as e:
             _LOGGER.warning("Sync time failed: %s", e)
-            return False
+            ok = False
+        self._record(ok, started)
+        return ok
 
     async def disconnect(self) -> None:
+        await self._stream.stop()
         try:
             await self._device.disconnect()
         except Exception:
-            pass
+            # stop_notify fails when notifications never started; still release the link
+            client = self._device._protocol.client  # noqa: SLF001
+            if client is not None:
+                try:
+                    await client.disconnect()
+                except Exception:
+                    pass
+        self._linked = False
         self._state.clear()
 
     async def trigger_feed(self, portions: int = 1) -> bool:
+        started = time.monotonic()
         try:
-            return await self._device.feed(portions=min(15, max(1, portions)))
+            async with self._lock:
+                ok = await self._device.feed(portions=min(15, max(1, portions)))
         except Exception as e:
             _LOGGER.warning("Feed failed: %s", e)
-            return False
+            ok = False
+        self._record(ok, started, feed=True)
+        return ok
 
     async def set_child_lock(self, locked: bool) -> bool:
+        started = time.monotonic()
         try:
-            ok = await self._device.set_child_lock(locked)
-            if ok:
-                self._optimistic["child_lock"] = locked
-                self._notify_listeners()
-            return ok
+            async with self._lock:
+                ok = await self._device.set_child_lock(locked)
         except Exception as e:
             _LOGGER.warning("Set child lock failed: %s", e)
-            return False
+            ok = False
+        if ok:
+            self._optimistic["child_lock"] = locked
+        self._record(ok, started)
+        return ok
 
     async def set_prompt_sound(self, on: bool) -> bool:
+        started = time.monotonic()
         try:
-            ok = await self._device.set_sound(on)
-            if ok:
-                self._optimistic["prompt_sound"] = on
-                self._notify_listeners()
-            return ok
+            async with self._lock:
+                ok = await self._device.set_sound(on)
         except Exception as e:
             _LOGGER.warning("Set sound failed: %s", e)
-            return False
+            ok = False
+        if ok:
+            self._optimistic["prompt_sound"] = on
+        self._record(ok, started)
+        return ok
+
+    async def set_feed_plan(self, slots: Iterable[FeedSlot | dict]) -> bool:
+        """Set feed schedule. slots: FeedSlot or {weekdays, time, portions, enabled} dicts.
+
+        Raises ValueError for invalid slot dicts. Skips the write when the plan
+        matches the one last read from (or written to) the feeder.
+        """
+        plan = parse_plan(slots)
+        if plan == self._state.feed_plan:
+            _LOGGER.debug("Feed plan unchanged, not writing %d slot(s)", len(plan))
+            return True
+        from petnetizen_feeder import FeedSchedule
 
-    async def set_feed_plan(self, slots: list[dict]) -> bool:
-        """Set feed schedule. slots: list of {weekdays, time, portions, enabled}."""
-        schedules: list[FeedSchedule] = []
-        for s in slots:
-            weekdays = s.get("weekdays") or Weekday.ALL_DAYS
-            if isinstance(weekdays, str) and weekdays.lower() == "all":
-                weekdays = Weekday.ALL_DAYS
-            time_str = s.get("time", "08:00")
-            portions = min(15, max(1, s.get("portions", 1)))
-            enabled = s.get("enabled", True)
-            schedules.append(
-                FeedSchedule(weekdays=weekdays, time=time_str, portions=portions, enabled=enabled)
+        schedules = [
+            FeedSchedule(
+                weekdays=slot.weekday_names,
+                time=slot.time,
+                portions=slot.portions,
+                enabled=slot.enabled,
             )
+            for slot in plan
+        ]
+        started = time.monotonic()
         try:
-            return await self._device.set_schedule(schedules)
+            async with self._lock:
+                ok = await self._device.set_schedule(schedules)
         except Exception as e:
             _LOGGER.warning("Set schedule failed: %s", e)
-            return False
+            ok = False
+        if ok:
+            self._set_feed_plan_state(plan)
+        self._record(ok, started)
+        return ok
+
+    async def apply_settings(self, profile: SettingsProfile) -> bool:
+        """Write the profile settings that differ from the known state, back to back.
+
+        Settings are sent in one pass over the current connection, each as soon as
+        the previous write went out. Nothing is read back from the feeder: the known
+        state is what this integration wrote over the current link, so a setting is
+        cached once written and after a failure only the settings still missing are
+        written on the next attempt; settings_written lists the ones this call sent.
+        V2 models use other data points for these settings and are refused.
+        """
+        async with self._lock:
+            self._check_link()
+            self._settings_written = ()
+            if self.v2_protocol:
+                _LOGGER.warning("Settings profiles are not supported on %s", self.name)
+                return False
+            changes = profile.changes(self._view)
+            if not changes:
+                _LOGGER.debug("Settings unchanged on %s, nothing to write", self._address)
+                return True
+            started = time.monotonic()
+            ok = True
+            for key, value in changes.items():
+                try:
+                    await self._write_frame(
+                        self._encode(SETTING_COMMANDS[key], setting_payload(value))
+                    )
+                except Exception as e:
+                    _LOGGER.warning("Set %s failed: %s", key, e)
+                    ok = False
+                    break
+                setattr(self._state, key, value)
+                self._settings_written += (key,)
+            self._record(ok, started)
+            return ok
+
+    def _set_feed_plan_state(self, plan: FeedPlan) -> None:
+        self._state.feed_plan = plan
 
     async def query_status(self) -> None:
         """Query schedule and update state."""
         async with self._lock:
+            self._check_link()
+            await self._send_piggyback_queries()
             try:
                 raw = await self._device.query_schedule()
-                # Library returns list of dicts; normalize to feed_plan_slots format
-                slots = []
-                for item in raw if isinstance(raw, list) else []:
-                    if isinstance(item, dict):
-                        slots.append(
-                            {
-                                "weekdays": item.get("weekdays", []),
-                                "time": item.get("time", "00:00"),
-                                "portions": item.get("portions", 1),
-                                "enabled": item.get("enabled", True),
-                            }
-                        )
-                    else:
-                        slots.append(
-                            {"weekdays": [], "time": "00:00", "portions": 1, "enabled": True}
-                        )
-                self._state["feed_plan_slots"] = slots
+                # Library returns list of dicts; normalize to FeedSlot (non-dict items become empty slots)
+                items = raw if isinstance(raw, list) else []
+                self._set_feed_plan_state(tuple(FeedSlot.from_device(item) for item in items))
                 self._notify_listeners()
             except Exception as e:
                 _LOGGER.debug("Query schedule failed: %s", e)
@@ -195,19 +458,167 @@ class NetizenBLEDevice:
             try:
                 child_lock = await self._device.get_child_lock_status()
                 if child_lock is not None:
-                    self._state["child_lock"] = child_lock
+                    self._state.child_lock = child_lock
                     self._optimistic.pop("child_lock", None)
             except Exception as e:
                 _LOGGER.debug("Query child lock failed: %s", e)
             try:
                 prompt_sound = await self._device.get_prompt_sound_status()
                 if prompt_sound is not None:
-                    self._state["prompt_sound"] = prompt_sound
+                    self._state.prompt_sound = prompt_sound
                     self._optimistic.pop("prompt_sound", None)
             except Exception as e:
                 _LOGGER.debug("Query prompt sound failed: %s", e)
+            self._scan_notifications()
             self._notify_listeners()
 
+    async def _send_piggyback_queries(self) -> None:
+        """Ask for power mode (and battery level on V2 models) without waiting for the answers.
+
+        The replies arrive while the library waits for the schedule and are read by
+        _scan_notifications at the end of the pass, so they add no round trip.
+        """
+        commands = (V2_POWER_MODE, V2_BATTERY) if self.v2_protocol else (POWER_MODE,)
+        for command in commands:
+            try:
+                await self._write_frame(self._encode(command, b""))
+            except Exception as e:
+                _LOGGER.debug("Piggyback query %s failed: %s", command, e)
+                return
+
+    def _scan_notifications(self) -> None:
+        """Pick power mode and battery level out of notifications since the last pass.
+
+        Only V2 models report a battery level; on standard feeders 0x09 is feed state.
+        """
+        protocol = self._device._protocol  # noqa: SLF001
+        received = protocol.received_data
+        if self._scan_cursor > len(received):
+            self._scan_cursor = 0  # the library cleared its buffer
+        v2 = self.v2_protocol
+        power_mode = V2_POWER_MODE if v2 else POWER_MODE
+        for data in received[self._scan_cursor :]:
+            decoded = protocol.decode_notification(data)
+            command = decoded.get("command")
+            payload = decoded.get("data_bytes", b"")
+            if command == power_mode and payload:
+                self._state.power_mode = "battery" if payload[0] == 0 else "dc"
+            elif v2 and command == V2_BATTERY and len(payload) >= 6 and payload[5] <= 100:
+                self._set_battery_level(payload[5])
+        self._scan_cursor = len(received)
+
+    def _set_battery_level(self, level: int) -> None:
+        self._state.battery_level = level
+        if self._battery.add(level, time.time()):
+            forecast = self._battery.forecast()
+            self._state.battery_low_at = (
+                dt_util.utc_from_timestamp(forecast) if forecast is not None else None
+            )
+
+    def stream_joystick(self, value: int) -> None:
+        """Du-TC02: send a joystick (0x58) value; older values still queued are dropped."""
+        self._submit_tc02("joystick", TC02_JOYSTICK, bytes([value & 0xFF]))
+
+    def stream_color_rgb(self, r: int, g: int, b: int) -> None:
+        """Du-TC02: send a laser color (0x52); older colors still queued are dropped."""
+        self._submit_tc02(
+            "color_rgb", TC02_COLOR_RGB, bytes(min(255, max(0, c)) for c in (r, g, b))
+        )
+
+    def _submit_tc02(self, channel: str, command: str, payload: bytes) -> None:
+        # Other models use these data points for something else, or not at all
+        if not self.is_model(TC02_MODEL):
+            _LOGGER.debug("%s is not a %s, not sending %s", self.name, TC02_MODEL, channel)
+            return
+        self._stream.submit(channel, self._encode(command, payload))
+
+    async def _write_stream_frame(self, frame: bytes) -> None:
+        """Stream writes take the device lock like every other link operation.
+
+        A query or feed holding it only delays the stream, which sends the newest
+        value once the lock is free.
+        """
+        async with self._lock:
+            await self._write_frame(frame)
+
+    def _encode(self, command: str, payload: bytes) -> bytes:
+        return self._device._protocol.encode_command(command, len(payload), payload.hex())  # noqa: SLF001
+
+    async def _write_frame(self, frame: bytes) -> None:
+        protocol = self._device._protocol  # noqa: SLF001
+        client = protocol.client
+        if client is None or not client.is_connected:
+            raise ConnectionError("feeder not connected")
+        if self._write_response is None:
+            char = client.services.get_characteristic(protocol.write_uuid)
+            self._write_response = (
+                char is not None and "write-without-response" not in char.properties
+            )
+        await client.write_gatt_char(protocol.write_uuid, frame, response=self._write_response)
+
+    async def dispense_reward(self) -> bool:
+        """DU-PD01: dispense one training reward (train 0x41)."""
+        started = time.monotonic()
+        try:
+            async with self._lock:
+                await self._write_frame(self._encode(PD01_TRAIN, TRAIN_REWARD))
+            ok = True
+        except Exception as e:
+            _LOGGER.warning("Dispense reward failed: %s", e)
+            ok = False
+        self._record(ok, started)
+        return ok
+
+    async def _query(self, command: str) -> bytes | None:
+        """Send a data point query and return the payload of its reply, or None.
+
+        The link lock is held until the reply arrives, so no other command's
+        reply can be taken for this one.
+        """
+        async with self._lock:
+            return await self._query_locked(command)
+
+    async def _query_locked(self, command: str) -> bytes | None:
+        protocol = self._device._protocol  # noqa: SLF001
+        seen = len(protocol.received_data)
+        try:
+            await self._write_frame(self._encode(command, b""))
+        except Exception as e:
+            _LOGGER.debug("Query %s failed: %s", command, e)
+            return None
+        code = int(command, 16)
+        deadline = time.monotonic() + REPLY_TIMEOUT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+            # The library may have cleared its buffer meanwhile
+            received = protocol.received_data
+            seen = min(seen, len(received))
+            for data in received[seen:]:
+                if len(data) >= 4 and data[0] == 0xEA and data[1] == code:
+                    return bytes(data[3 : 3 + data[2]])
+        _LOGGER.debug("No reply to query %s from %s", command, self._address)
+        return None
+
+    async def query_train_count(self) -> int | None:
+        """DU-PD01: read train_count (0x40) and store it in state."""
+        payload = await self._query(PD01_TRAIN_COUNT)
+        if payload is None:
+            return None
+        count = int.from_bytes(payload, "big")
+        self._state.train_count = count
+        self._notify_listeners()
+        return count
+
+    async def query_feed_state(self) -> int | None:
+        """Read the feed_state (0x09) status byte: 0 idle, 1 dispensing, 2 error.
+
+        Standard-protocol feeders only; V2 models report their battery on 0x09.
+        """
+        if self.v2_protocol:
+            return None
+        payload = await self._query(FEED_STATE)
+        return payload[0] if payload else None
+
     async def query_feed_plan(self) -> bool:
         """Request schedule refresh."""
         await self.query_status()
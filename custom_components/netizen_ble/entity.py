@@ -0,0 +1,63 @@
+"""Base entity for Netizen BLE platforms."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.entity import DeviceInfo, EntityDescription
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .coordinator import NetizenBLECoordinator
+
+
+class NetizenBLEEntity(CoordinatorEntity[NetizenBLECoordinator]):
+    """Coordinator entity that writes state only when its own state keys change.
+
+    Subclasses list the coordinator data keys they render in `_state_keys`. A
+    coordinator update that leaves those keys and availability untouched is not
+    written, so one feeder changing its schedule does not rewrite every switch.
+    """
+
+    _attr_has_entity_name = True
+    _state_keys: tuple[str, ...] = ()
+    # Commands sent through the outbox are queued while the feeder is out of range
+    _queues_commands = False
+
+    def __init__(
+        self,
+        coordinator: NetizenBLECoordinator,
+        device_info: DeviceInfo,
+        description: EntityDescription,
+    ) -> None:
+        super().__init__(coordinator)
+        self._device = coordinator.device
+        self._attr_device_info = device_info
+        self.entity_description = description
+        self._attr_unique_id = f"{self._device.address}_{description.key}"
+        self._written: tuple[Any, ...] | None = None
+
+    @property
+    def available(self) -> bool:
+        """Connected, or out of range for an entity whose commands the outbox can queue.
+
+        Home Assistant skips unavailable entities when it dispatches entity services,
+        so queueing entities must stay available for commands to reach the outbox.
+        """
+        return self.coordinator.connected or self._queues_commands
+
+    def _fingerprint(self) -> tuple[Any, ...]:
+        data = self.coordinator.data or {}
+        return (self.available, *(data.get(key) for key in self._state_keys))
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self._written = self._fingerprint()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        fingerprint = self._fingerprint()
+        if fingerprint == self._written:
+            return
+        self._written = fingerprint
+        self.async_write_ha_state()
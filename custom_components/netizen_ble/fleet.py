@@ -0,0 +1,258 @@
+"""Domain-wide totals across all Netizen BLE feeders, maintained incrementally.
+
+The fleet sensors have no config entry of their own: the sensor platform of the
+first feeder entry to load hosts them, and when that entry unloads they are
+added again through the platform of another loaded entry. Their registry
+entries (and the fleet device) follow the hosting entry, so which config entry
+they belong to depends on the order entries load and unload. Feeds today counts acknowledged
+manual feeds plus scheduled feeds confirmed by each feeder's report.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_point_in_time, async_track_time_change
+from homeassistant.util import dt as dt_util
+
+from .const import DATA_FLEET
+from .schedule import next_feed
+
+if TYPE_CHECKING:
+    from .coordinator import NetizenBLECoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+FleetListener = Callable[[set[str]], None]
+
+
+@dataclass(slots=True, frozen=True)
+class _Contribution:
+    """What one feeder currently adds to the totals."""
+
+    connected: bool = False
+    feeds: int = 0
+    commands: int = 0
+    failures: int = 0
+    latency_total: float = 0.0
+    next_feed: datetime | None = None
+
+
+class NetizenBLEFleet:
+    """Keep fleet totals up to date from coordinator updates.
+
+    Each update replaces the feeder's previous contribution by adding the difference,
+    so the cost does not depend on the number of feeders. The next feed across the
+    fleet comes from a heap with stale entries skipped on read.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self._coordinators: dict[str, NetizenBLECoordinator] = {}
+        self._contributions: dict[str, _Contribution] = {}
+        self._unsubs: dict[str, CALLBACK_TYPE] = {}
+        self._listeners: list[FleetListener] = []
+        self._day: date = dt_util.now().date()
+        self.connected = 0
+        self.feeds_today = 0
+        self.commands_today = 0
+        self.failures_today = 0
+        self._latency_total = 0.0
+        self._next: dict[str, datetime] = {}
+        self._heap: list[tuple[datetime, str]] = []
+        self._unsub_next: CALLBACK_TYPE | None = None
+        self._unsub_midnight = async_track_time_change(
+            hass, self._async_new_day, hour=0, minute=0, second=0
+        )
+        # Entry whose sensor platform owns the fleet sensors, and all candidates
+        self._owner: str | None = None
+        self._platforms: dict[str, AddEntitiesCallback] = {}
+
+    @property
+    def devices(self) -> int:
+        return len(self._coordinators)
+
+    @property
+    def unavailable(self) -> int:
+        return len(self._coordinators) - self.connected
+
+    @property
+    def mean_latency_ms(self) -> float | None:
+        if not self.commands_today:
+            return None
+        return round(self._latency_total / self.commands_today * 1000, 1)
+
+    @property
+    def next_feed(self) -> tuple[datetime, str] | None:
+        """Earliest upcoming feed as (time, feeder address)."""
+        while self._heap and self._next.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0] if self._heap else None
+
+    def name_of(self, address: str) -> str:
+        coord = self._coordinators.get(address)
+        return coord.device.name if coord else address
+
+    @callback
+    def async_add_listener(self, listener: FleetListener) -> CALLBACK_TYPE:
+        """Call listener with the names of the totals that changed."""
+        self._listeners.append(listener)
+
+        @callback
+        def remove() -> None:
+            self._listeners.remove(listener)
+
+        return remove
+
+    @callback
+    def async_add_coordinator(self, coord: NetizenBLECoordinator) -> CALLBACK_TYPE:
+        address = coord.device.address
+        self._coordinators[address] = coord
+        self._contributions[address] = _Contribution()
+        self._unsubs[address] = coord.async_add_listener(
+            lambda: self._async_device_updated(address)
+        )
+        self._async_device_updated(address, {"devices"})
+
+        @callback
+        def remove() -> None:
+            self._unsubs.pop(address)()
+            del self._coordinators[address]
+            self._apply(address, _Contribution(), {"devices"})
+            del self._contributions[address]
+            self._release_if_unused()
+
+        return remove
+
+    @callback
+    def _async_device_updated(self, address: str, changed: set[str] | None = None) -> None:
+        device = self._coordinators[address].device
+        stats = device.stats
+        today = stats.day == self._day
+        self._apply(
+            address,
+            _Contribution(
+                connected=device.is_connected,
+                feeds=stats.feeds if today else 0,
+                commands=stats.commands if today else 0,
+                failures=stats.failures if today else 0,
+                latency_total=stats.latency_total if today else 0.0,
+                next_feed=next_feed(device.get_state("feed_plan") or (), dt_util.now()),
+            ),
+            changed or set(),
+        )
+
+    def _apply(self, address: str, new: _Contribution, changed: set[str]) -> None:
+        old = self._contributions[address]
+        if new == old and not changed:
+            return
+        self._contributions[address] = new
+        if new.connected != old.connected:
+            self.connected += new.connected - old.connected
+            changed.add("connected")
+        if new.feeds != old.feeds:
+            self.feeds_today += new.feeds - old.feeds
+            changed.add("feeds_today")
+        if new.failures != old.failures:
+            self.failures_today += new.failures - old.failures
+            changed.add("failures_today")
+        if new.commands != old.commands:
+            self.commands_today += new.commands - old.commands
+            self._latency_total += new.latency_total - old.latency_total
+            changed.add("command_latency")
+        if new.next_feed != old.next_feed:
+            if new.next_feed is None:
+                self._next.pop(address, None)
+            else:
+                self._next[address] = new.next_feed
+                heapq.heappush(self._heap, (new.next_feed, address))
+            changed.add("next_feed")
+            self._schedule_next_feed()
+        if changed:
+            for listener in list(self._listeners):
+                listener(changed)
+
+    def _schedule_next_feed(self) -> None:
+        """Advance the feeder whose slot is due, so next_feed never shows a past time."""
+        if self._unsub_next:
+            self._unsub_next()
+            self._unsub_next = None
+        if upcoming := self.next_feed:
+            self._unsub_next = async_track_point_in_time(
+                self.hass, self._async_feed_due, upcoming[0]
+            )
+
+    @callback
+    def _async_feed_due(self, _now: datetime) -> None:
+        self._unsub_next = None
+        if upcoming := self.next_feed:
+            self._async_device_updated(upcoming[1])
+
+    @callback
+    def _async_new_day(self, now: datetime) -> None:
+        """Daily totals start over at local midnight."""
+        self._day = now.date()
+        self.feeds_today = self.commands_today = self.failures_today = 0
+        self._latency_total = 0.0
+        for address, old in self._contributions.items():
+            self._contributions[address] = _Contribution(
+                connected=old.connected, next_feed=old.next_feed
+            )
+        for listener in list(self._listeners):
+            listener({"feeds_today", "failures_today", "command_latency"})
+
+    @callback
+    def async_add_platform(self, entry_id: str, async_add_entities: AddEntitiesCallback) -> bool:
+        """Offer an entry's sensor platform to host the fleet sensors; True if it should."""
+        self._platforms[entry_id] = async_add_entities
+        if self._owner is not None:
+            return False
+        self._owner = entry_id
+        return True
+
+    @callback
+    def async_remove_platform(self, entry_id: str) -> tuple[str, AddEntitiesCallback] | None:
+        """Forget an entry's platform; return the platform taking over the fleet sensors."""
+        self._platforms.pop(entry_id, None)
+        if self._owner != entry_id:
+            return None
+        self._owner = next(iter(self._platforms), None)
+        if self._owner is None:
+            self._release_if_unused()
+            return None
+        return self._owner, self._platforms[self._owner]
+
+    def _release_if_unused(self) -> None:
+        """Drop the fleet once the last feeder and sensor platform are gone."""
+        if self._coordinators or self._platforms:
+            return
+        self._unsub_midnight()
+        if self._unsub_next:
+            self._unsub_next()
+        self.hass.data.pop(DATA_FLEET, None)
+
+    def as_dict(self) -> dict[str, Any]:
+        upcoming = self.next_feed
+        return {
+            "devices": self.devices,
+            "connected": self.connected,
+            "unavailable": self.unavailable,
+            "feeds_today": self.feeds_today,
+            "failures_today": self.failures_today,
+            "command_latency_ms": self.mean_latency_ms,
+            "next_feed": upcoming[0].isoformat() if upcoming else None,
+        }
+
+
+@callback
+def async_get_fleet(hass: HomeAssistant) -> NetizenBLEFleet:
+    if (fleet := hass.data.get(DATA_FLEET)) is None:
+        fleet = hass.data[DATA_FLEET] = NetizenBLEFleet(hass)
+    return fleet
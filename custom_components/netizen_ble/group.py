@@ -0,0 +1,136 @@
+"""Synchronized feed and settings fan-out across several Netizen BLE feeders."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from collections.abc import Sequence
+from typing import Any
+
+from homeassistant.components import bluetooth
+from homeassistant.core import HomeAssistant
+
+from .const import ADAPTER_FEED_CONCURRENCY
+from .coordinator import NetizenBLECoordinator
+from .settings import SettingsProfile
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _adapter_source(hass: HomeAssistant, address: str) -> str:
+    """Return the adapter/proxy that last heard the feeder (writes share its radio)."""
+    info = bluetooth.async_last_service_info(hass, address, connectable=True)
+    return info.source if info else "unknown"
+
+
+async def async_feed_group(
+    hass: HomeAssistant,
+    coordinators: Sequence[NetizenBLECoordinator],
+    portions: int | None = None,
+) -> dict[str, Any]:
+    """Feed all given feeders at once; return per-device ack latency and the spread.
+
+    Feed tasks are created up front and released together by one event so they
+    start within the same loop iteration. At most ADAPTER_FEED_CONCURRENCY feeds
+    run at a time on each Bluetooth adapter or proxy.
+    """
+    semaphores: dict[str, asyncio.Semaphore] = defaultdict(
+        lambda: asyncio.Semaphore(ADAPTER_FEED_CONCURRENCY)
+    )
+    go = asyncio.Event()
+    start = 0.0
+
+    async def _feed(coord: NetizenBLECoordinator) -> dict[str, Any]:
+        device = coord.device
+        semaphore = semaphores[_adapter_source(hass, device.address)]
+        await go.wait()
+        async with semaphore:
+            sent = time.monotonic()
+            # Through the coordinator, so an unreachable feeder queues its feed
+            ok = await coord.async_feed(portions or coord.feed_portions)
+            acked = time.monotonic()
+        return {
+            "address": device.address,
+            "name": device.name,
+            "success": ok,
+            "queued": not ok and coord.outbox.pending > 0,
+            "start_offset_ms": round((sent - start) * 1000, 1),
+            "latency_ms": round((acked - sent) * 1000, 1),
+        }
+
+    tasks = [asyncio.create_task(_feed(coord)) for coord in coordinators]
+    await asyncio.sleep(0)  # let every task reach go.wait()
+    start = time.monotonic()
+    go.set()
+    results: list[dict[str, Any]] = list(await asyncio.gather(*tasks))
+
+    acked = [r["start_offset_ms"] + r["latency_ms"] for r in results if r["success"]]
+    spread_ms = round(max(acked) - min(acked), 1) if acked else None
+    _LOGGER.debug(
+        "feed_group: %d/%d feeders acknowledged, spread %s ms",
+        len(acked),
+        len(results),
+        spread_ms,
+    )
+    for coord in coordinators:
+        hass.async_create_task(coord.async_request_refresh())
+    return {"results": results, "spread_ms": spread_ms}
+
+
+async def async_apply_settings(
+    hass: HomeAssistant,
+    coordinators: Sequence[NetizenBLECoordinator],
+    profile: SettingsProfile,
+) -> dict[str, Any]:
+    """Apply one settings profile to all given feeders; return what each one wrote.
+
+    Each feeder only gets the settings that differ from what was written to it
+    over its current connection (nothing is read back), in one pass. Feeders
+    sharing a Bluetooth adapter or proxy are written at most
+    ADAPTER_FEED_CONCURRENCY at a time; unreachable feeders keep the profile in
+    their outbox. V2 models write these settings to other data points and are
+    reported as unsupported without being sent anything.
+    """
+    semaphores: dict[str, asyncio.Semaphore] = defaultdict(
+        lambda: asyncio.Semaphore(ADAPTER_FEED_CONCURRENCY)
+    )
+
+    async def _apply(coord: NetizenBLECoordinator) -> dict[str, Any]:
+        device = coord.device
+        if device.v2_protocol:
+            return {
+                "address": device.address,
+                "name": device.name,
+                "success": False,
+                "unsupported": True,
+                "queued": False,
+                "written": [],
+                "unchanged": [],
+            }
+        async with semaphores[_adapter_source(hass, device.address)]:
+            ok = await coord.async_apply_settings(profile)
+            queued = not ok and coord.outbox.pending > 0
+            # Unless queued, this profile was the last one sent, so these are its writes
+            written = [] if queued else list(device.settings_written)
+        return {
+            "address": device.address,
+            "name": device.name,
+            "success": ok,
+            "unsupported": False,
+            "queued": queued,
+            "written": written,
+            "unchanged": [key for key in profile.values() if key not in written],
+        }
+
+    results: list[dict[str, Any]] = list(
+        await asyncio.gather(*(_apply(coord) for coord in coordinators))
+    )
+    _LOGGER.debug(
+        "apply_settings: %d/%d feeders applied %s",
+        sum(r["success"] for r in results),
+        len(results),
+        profile.as_dict(),
+    )
+    return {"results": results}
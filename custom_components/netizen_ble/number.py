@@ -9,10 +9,10 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
 from .coordinator import NetizenBLECoordinator
+from .entity import NetizenBLEEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -44,7 +44,7 @@ async def async_setup_entry(
     async_add_entities([entity])
 
 
-class NetizenBLENumber(CoordinatorEntity[NetizenBLECoordinator], NumberEntity):
+class NetizenBLENumber(NetizenBLEEntity, NumberEntity):
     """Portions to use for manual feed (1–15)."""
 
     def __init__(
@@ -53,23 +53,14 @@ class NetizenBLENumber(CoordinatorEntity[NetizenBLECoordinator], NumberEntity):
         device_info: DeviceInfo,
         description: NumberEntityDescription,
     ) -> None:
-        super().__init__(coordinator)
-        self._device = coordinator.device
-        self._attr_device_info = device_info
-        self.entity_description = description
-        self._attr_unique_id = f"{self._device.address}_{description.key}"
-        self._attr_has_entity_name = True
+        super().__init__(coordinator, device_info, description)
         self._portions = 1
 
-    @property
-    def available(self) -> bool:
-        return self.coordinator.connected
-
     @property
     def native_value(self) -> float | None:
         return float(self._portions)
 
     async def async_set_native_value(self, value: float) -> None:
         self._portions = int(min(15, max(1, round(value))))
-        self.coordinator._feed_portions = self._portions  # noqa: SLF001
+        self.coordinator.feed_portions = self._portions
         self.async_write_ha_state()
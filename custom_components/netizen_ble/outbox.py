@@ -0,0 +1,185 @@
+"""Persistent per-device outbox for commands issued while a feeder is unreachable."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .device import NetizenBLEDevice
+from .settings import SettingsProfile
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 1.0
+
+# Seconds a queued command stays valid. A late feed is worse than none, settings keep longer.
+COMMAND_TTL: dict[str, float] = {
+    "feed": 15 * 60,
+    "set_feed_plan": 7 * 24 * 3600,
+    "set_child_lock": 24 * 3600,
+    "set_prompt_sound": 24 * 3600,
+    "apply_settings": 24 * 3600,
+}
+# Commands where only the latest queued value matters
+COLLAPSE = frozenset({"set_feed_plan", "set_child_lock", "set_prompt_sound"})
+
+
+async def _send(device: NetizenBLEDevice, kind: str, args: dict[str, Any]) -> bool:
+    if kind == "feed":
+        return await device.trigger_feed(portions=args["portions"])
+    if kind == "set_feed_plan":
+        return await device.set_feed_plan(args["slots"])
+    if kind == "set_child_lock":
+        return await device.set_child_lock(args["locked"])
+    if kind == "set_prompt_sound":
+        return await device.set_prompt_sound(args["on"])
+    if kind == "apply_settings":
+        return await device.apply_settings(SettingsProfile.from_dict(args["settings"]))
+    raise ValueError(f"unknown outbox command {kind}")
+
+
+class NetizenBLEOutbox:
+    """Queue of commands for one feeder, persisted with HA Store and flushed in order."""
+
+    def __init__(self, hass: HomeAssistant, device: NetizenBLEDevice) -> None:
+        self._device = device
+        self._store: Store[dict[str, Any]] = Store(
+            hass,
+            STORAGE_VERSION,
+            f"{DOMAIN}.outbox.{device.address.replace(':', '').lower()}",
+        )
+        self._commands: list[dict[str, Any]] = []
+        self._lock = asyncio.Lock()
+
+    @property
+    def pending(self) -> int:
+        return len(self._commands)
+
+    @property
+    def flushing(self) -> bool:
+        return self._lock.locked()
+
+    async def async_load(self) -> None:
+        data = await self._store.async_load() or {}
+        self._commands = [
+            c
+            for c in data.get("commands", [])
+            if isinstance(c, dict)
+            and c.get("kind") in COMMAND_TTL
+            and isinstance(c.get("args"), dict)
+            and isinstance(c.get("expires"), (int, float))
+        ]
+        self._drop_expired()
+
+    def _save(self) -> None:
+        self._store.async_delay_save(lambda: {"commands": self._commands}, SAVE_DELAY)
+
+    def _drop_expired(self) -> None:
+        now = time.time()
+        expired = [c for c in self._commands if c["expires"] <= now]
+        if expired:
+            _LOGGER.info(
+                "Dropping %d expired queued command(s) for %s: %s",
+                len(expired),
+                self._device.address,
+                ", ".join(c["kind"] for c in expired),
+            )
+            self._commands = [c for c in self._commands if c["expires"] > now]
+            self._save()
+
+    def _enqueue(self, kind: str, args: dict[str, Any]) -> None:
+        if kind in COLLAPSE:
+            self._commands = [c for c in self._commands if c["kind"] != kind]
+        now = time.time()
+        self._commands.append(
+            {"kind": kind, "args": args, "created": now, "expires": now + COMMAND_TTL[kind]}
+        )
+        self._save()
+
+    async def async_send(self, kind: str, **args: Any) -> bool:
+        """Send a command now, or queue it if the feeder is unreachable.
+
+        With commands already pending the new one joins the queue (replacing an older
+        value it collapses with) and the queue is flushed, so order is kept. Returns
+        True only when the command reached the feeder.
+        """
+        async with self._lock:
+            if not self._commands:
+                if await _send(self._device, kind, args):
+                    return True
+                if self._device.is_connected:
+                    # The feeder answered but refused or timed out; retrying could double-feed
+                    return False
+                self._enqueue(kind, args)
+            else:
+                self._enqueue(kind, args)
+                if await self._async_flush_locked():
+                    return True
+            _LOGGER.info(
+                "Feeder %s unreachable, queued %s (%d pending)",
+                self._device.address,
+                kind,
+                len(self._commands),
+            )
+            return False
+
+    async def async_flush(self) -> bool:
+        """Reconnect once and send queued commands back to back; True when the queue is empty."""
+        async with self._lock:
+            return await self._async_flush_locked()
+
+    async def _async_flush_locked(self) -> bool:
+        self._drop_expired()
+        if not self._commands:
+            return True
+        # One session for the whole batch: raw writes (apply_settings) never reconnect
+        # on their own, and library commands would otherwise reconnect one by one
+        if not await self._device.ensure_connected():
+            return False
+        sent = dropped = 0
+        try:
+            while self._commands:
+                command = self._commands[0]
+                try:
+                    ok = await _send(self._device, command["kind"], command["args"])
+                except (KeyError, ValueError) as err:
+                    # A corrupt stored command would otherwise block the queue for good
+                    _LOGGER.warning(
+                        "Dropping invalid queued %s for %s: %s",
+                        command.get("kind"),
+                        self._device.address,
+                        err,
+                    )
+                    dropped += 1
+                    self._commands.pop(0)
+                    continue
+                if ok:
+                    sent += 1
+                elif not self._device.is_connected:
+                    return False
+                else:
+                    _LOGGER.warning(
+                        "Feeder %s rejected queued %s, dropping it",
+                        self._device.address,
+                        command["kind"],
+                    )
+                    dropped += 1
+                self._commands.pop(0)
+            return True
+        finally:
+            if sent:
+                _LOGGER.info(
+                    "Flushed %d queued command(s) to %s (%d pending)",
+                    sent,
+                    self._device.address,
+                    len(self._commands),
+                )
+            if sent or dropped:
+                self._save()
@@ -0,0 +1,184 @@
+"""Feed plan slots shared by the set_feed_plan service and the device wrapper."""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+import voluptuous as vol
+
+# Bit order matches the feeder protocol (bit 0 = Sunday)
+WEEKDAYS = ("sun", "mon", "tue", "wed", "thu", "fri", "sat")
+WEEKDAY_BITS = {day: 1 << i for i, day in enumerate(WEEKDAYS)}
+ALL_DAYS = 0x7F
+_DAY_NAMES = {
+    **WEEKDAY_BITS,
+    **{
+        name: WEEKDAY_BITS[name[:3]]
+        for name in (
+            "sunday",
+            "monday",
+            "tuesday",
+            "wednesday",
+            "thursday",
+            "friday",
+            "saturday",
+        )
+    },
+    "all": ALL_DAYS,
+    "weekdays": 0x3E,
+    "weekend": 0x41,
+}
+
+MIN_PORTIONS = 1
+MAX_PORTIONS = 15
+
+# "HH:MM", optionally with seconds as sent by the HA time selector
+_TIME_RE = re.compile(r"^([01]?\d|2[0-3]):([0-5]\d)(?::[0-5]\d)?$")
+
+
+def parse_weekdays(value: Any) -> int:
+    """Return the weekday bitmask for a day name, group name or list of day names.
+
+    An empty value means every day, as on the feeder app.
+    """
+    if not value:
+        return ALL_DAYS
+    if isinstance(value, str):
+        value = [value]
+    mask = 0
+    for day in value:
+        bit = _DAY_NAMES.get(str(day).strip().lower())
+        if bit is None:
+            raise ValueError(f"invalid weekday {day!r}")
+        mask |= bit
+    return mask
+
+
+def parse_time(value: Any) -> int:
+    """Return minute of day for an "HH:MM" string."""
+    match = _TIME_RE.match(str(value).strip())
+    if not match:
+        raise ValueError(f"invalid time {value!r}, expected HH:MM")
+    return int(match[1]) * 60 + int(match[2])
+
+
+@dataclass(frozen=True, slots=True)
+class FeedSlot:
+    """One feed plan entry: weekday bitmask, minute of day, portions, enabled."""
+
+    weekdays: int = ALL_DAYS
+    minute: int = 0
+    portions: int = MIN_PORTIONS
+    enabled: bool = True
+
+    @classmethod
+    def from_dict(cls, data: Any) -> FeedSlot:
+        """Parse a user-supplied slot; raise ValueError instead of silently clamping."""
+        if isinstance(data, FeedSlot):
+            return data
+        if not isinstance(data, Mapping):
+            raise ValueError("slot must be a mapping")
+        if "time" not in data:
+            raise ValueError("slot requires a time")
+        portions = data.get("portions", MIN_PORTIONS)
+        if (
+            isinstance(portions, bool)
+            or not isinstance(portions, int)
+            or not MIN_PORTIONS <= portions <= MAX_PORTIONS
+        ):
+            raise ValueError(f"portions must be {MIN_PORTIONS}-{MAX_PORTIONS}, got {portions!r}")
+        return cls(
+            weekdays=parse_weekdays(data.get("weekdays")),
+            minute=parse_time(data["time"]),
+            portions=portions,
+            enabled=bool(data.get("enabled", True)),
+        )
+
+    @classmethod
+    def from_device(cls, item: Any) -> FeedSlot:
+        """Build a slot from a query_schedule() item, keeping what the feeder reported."""
+        if not isinstance(item, Mapping):
+            return cls(weekdays=0)
+        # No weekdays means every day, as in parse_weekdays, so both sides compare equal
+        days = item.get("weekdays")
+        mask = 0 if days else ALL_DAYS
+        for day in days or ():
+            mask |= WEEKDAY_BITS.get(str(day).lower(), 0)
+        try:
+            minute = parse_time(item.get("time", "00:00"))
+        except ValueError:
+            minute = 0
+        portions = item.get("portions", MIN_PORTIONS)
+        return cls(
+            weekdays=mask,
+            minute=minute,
+            portions=portions if isinstance(portions, int) else MIN_PORTIONS,
+            enabled=bool(item.get("enabled", True)),
+        )
+
+    @property
+    def time(self) -> str:
+        return f"{self.minute // 60:02d}:{self.minute % 60:02d}"
+
+    @property
+    def weekday_names(self) -> list[str]:
+        return [day for day, bit in WEEKDAY_BITS.items() if self.weekdays & bit]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the feed_plan_slots attribute format."""
+        return {
+            "weekdays": self.weekday_names,
+            "time": self.time,
+            "portions": self.portions,
+            "enabled": self.enabled,
+        }
+
+
+FeedPlan = tuple[FeedSlot, ...]
+
+
+def parse_plan(slots: Iterable[Any]) -> FeedPlan:
+    """Parse user-supplied slots into a hashable plan."""
+    return tuple(FeedSlot.from_dict(slot) for slot in slots)
+
+
+def next_slot(plan: Iterable[FeedSlot], now: datetime) -> tuple[datetime, FeedSlot] | None:
+    """Return when the next enabled slot fires after now, and that slot.
+
+    The feeder clock runs on local time, so now should be local too.
+    """
+    weekday = (now.weekday() + 1) % 7  # datetime counts from Monday, the feeder from Sunday
+    minute_now = now.hour * 60 + now.minute
+    best: tuple[datetime, FeedSlot] | None = None
+    for slot in plan:
+        if not slot.enabled or not slot.weekdays & ALL_DAYS:
+            continue
+        offset = next(
+            days
+            for days in range(8)
+            if slot.weekdays & (1 << (weekday + days) % 7) and (days or slot.minute > minute_now)
+        )
+        when = (now + timedelta(days=offset)).replace(
+            hour=slot.minute // 60, minute=slot.minute % 60, second=0, microsecond=0
+        )
+        if best is None or when < best[0]:
+            best = (when, slot)
+    return best
+
+
+def next_feed(plan: Iterable[FeedSlot], now: datetime) -> datetime | None:
+    """Return when the next enabled slot fires after now (feeder clock runs on local time)."""
+    upcoming = next_slot(plan, now)
+    return upcoming[0] if upcoming else None
+
+
+def feed_slot(value: Any) -> FeedSlot:
+    """Voluptuous validator for one set_feed_plan schedule entry."""
+    try:
+        return FeedSlot.from_dict(value)
+    except ValueError as err:
+        raise vol.Invalid(str(err)) from err
@@ -1,19 +1,30 @@
-"""Netizen BLE sensor entities (feed plan)."""
+"""Netizen BLE sensor entities (feed plan, fleet totals)."""
 
 from __future__ import annotations
 
 import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
 from typing import Any
 
-from homeassistant.components.sensor import SensorEntity, SensorEntityDescription
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceEntryType
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
 from .coordinator import NetizenBLECoordinator
+from .entity import NetizenBLEEntity
+from .fleet import NetizenBLEFleet, async_get_fleet
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -30,6 +41,46 @@ SENSORS: list[SensorEntityDescription] = [
     ),
 ]
 
+# Power sensors; only V2 models report a battery level
+POWER_SENSORS: list[SensorEntityDescription] = [
+    SensorEntityDescription(
+        key="power_mode",
+        translation_key="power_mode",
+        device_class=SensorDeviceClass.ENUM,
+        options=["battery", "dc"],
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    SensorEntityDescription(
+        key="battery_level",
+        device_class=SensorDeviceClass.BATTERY,
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    SensorEntityDescription(
+        key="battery_low_at",
+        translation_key="battery_low_at",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        icon="mdi:battery-clock",
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+]
+
+# Coordinator data each sensor renders; other keys changing does not rewrite it
+SENSOR_STATE_KEYS: dict[str, tuple[str, ...]] = {
+    "feed_plan": ("feed_plan",),
+    "firmware_version": ("device_version", "device_name"),
+    "power_mode": ("power_mode",),
+    "battery_level": ("battery_level",),
+    "battery_low_at": ("battery_low_at", "battery_level"),
+}
+# Power sensors stay unavailable until the feeder has reported this value
+POWER_SENSOR_SOURCE = {
+    "power_mode": "power_mode",
+    "battery_level": "battery_level",
+    "battery_low_at": "battery_level",
+}
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -45,11 +96,103 @@ async def async_setup_entry(
         "manufacturer": "Pet Netizen",
         "model": device.get_state("device_name") or "Feeder",
     }
-    entities = [NetizenBLESensor(coordinator, device_info, desc) for desc in SENSORS]
+    entities: list[SensorEntity] = [
+        NetizenBLESensor(coordinator, device_info, desc) for desc in SENSORS
+    ]
+    entities.extend(
+        NetizenBLESensor(coordinator, device_info, desc)
+        for desc in POWER_SENSORS
+        if device.v2_protocol or desc.key == "power_mode"
+    )
+
+    # One entry at a time hosts the fleet sensors; another takes over when it unloads
+    fleet = async_get_fleet(hass)
+    if fleet.async_add_platform(entry.entry_id, async_add_entities):
+        entities.extend(_fleet_sensors(fleet))
+
+    @callback
+    def _async_hand_over_fleet() -> None:
+        if takeover := fleet.async_remove_platform(entry.entry_id):
+            takeover[1](_fleet_sensors(fleet))
+
+    entry.async_on_unload(_async_hand_over_fleet)
     async_add_entities(entities)
 
 
-class NetizenBLESensor(CoordinatorEntity[NetizenBLECoordinator], SensorEntity):
+@dataclass(frozen=True, kw_only=True)
+class NetizenFleetSensorEntityDescription(SensorEntityDescription):
+    """Fleet sensor: value from the fleet totals, refreshed when one of `watch` changes."""
+
+    value_fn: Callable[[NetizenBLEFleet], Any]
+    watch: frozenset[str]
+    attrs_fn: Callable[[NetizenBLEFleet], dict[str, Any]] = lambda _fleet: {}
+
+
+def _next_feed_attrs(fleet: NetizenBLEFleet) -> dict[str, Any]:
+    upcoming = fleet.next_feed
+    return {"feeder": fleet.name_of(upcoming[1])} if upcoming else {}
+
+
+FLEET_SENSORS: list[NetizenFleetSensorEntityDescription] = [
+    NetizenFleetSensorEntityDescription(
+        key="fleet_connected",
+        translation_key="fleet_connected",
+        icon="mdi:bluetooth-connect",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda fleet: fleet.connected,
+        attrs_fn=lambda fleet: {"devices": fleet.devices},
+        watch=frozenset({"connected", "devices"}),
+    ),
+    NetizenFleetSensorEntityDescription(
+        key="fleet_unavailable",
+        translation_key="fleet_unavailable",
+        icon="mdi:bluetooth-off",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda fleet: fleet.unavailable,
+        watch=frozenset({"connected", "devices"}),
+    ),
+    NetizenFleetSensorEntityDescription(
+        key="fleet_feeds_today",
+        translation_key="fleet_feeds_today",
+        icon="mdi:food-drumstick",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda fleet: fleet.feeds_today,
+        watch=frozenset({"feeds_today"}),
+    ),
+    NetizenFleetSensorEntityDescription(
+        key="fleet_failures_today",
+        translation_key="fleet_failures_today",
+        icon="mdi:alert-circle-outline",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda fleet: fleet.failures_today,
+        watch=frozenset({"failures_today"}),
+    ),
+    NetizenFleetSensorEntityDescription(
+        key="fleet_command_latency",
+        translation_key="fleet_command_latency",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda fleet: fleet.mean_latency_ms,
+        attrs_fn=lambda fleet: {"commands_today": fleet.commands_today},
+        watch=frozenset({"command_latency"}),
+    ),
+    NetizenFleetSensorEntityDescription(
+        key="fleet_next_feed",
+        translation_key="fleet_next_feed",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda fleet: upcoming[0] if (upcoming := fleet.next_feed) else None,
+        attrs_fn=_next_feed_attrs,
+        watch=frozenset({"next_feed"}),
+    ),
+]
+
+
+def _fleet_sensors(fleet: NetizenBLEFleet) -> list[SensorEntity]:
+    return [NetizenFleetSensor(fleet, desc) for desc in FLEET_SENSORS]
+
+
+class NetizenBLESensor(NetizenBLEEntity, SensorEntity):
     """Netizen BLE sensor (feed plan slot count)."""
 
     def __init__(
@@ -58,34 +201,81 @@ class NetizenBLESensor(CoordinatorEntity[NetizenBLECoordinator], SensorEntity):
         device_info: DeviceInfo,
         description: SensorEntityDescription,
     ) -> None:
-        super().__init__(coordinator)
-        self._device = coordinator.device
-        self._attr_device_info = device_info
-        self.entity_description = description
-        self._attr_unique_id = f"{self._device.address}_{description.key}"
-        self._attr_has_entity_name = True
+        super().__init__(coordinator, device_info, description)
+        self._state_keys = SENSOR_STATE_KEYS[description.key]
+        # (hash of the feed plan, attributes built from it)
+        self._attrs_cache: tuple[int, dict[str, Any]] | None = None
+        self._source_key = POWER_SENSOR_SOURCE.get(description.key)
 
     @property
     def available(self) -> bool:
-        return self.coordinator.connected
+        if not super().available:
+            return False
+        return (
+            self._source_key is None
+            or (self.coordinator.data or {}).get(self._source_key) is not None
+        )
 
     @property
-    def native_value(self) -> str | int | None:
+    def native_value(self) -> str | int | datetime | None:
         data = self.coordinator.data or {}
         if self.entity_description.key == "feed_plan":
-            slots = data.get("feed_plan_slots") or []
-            return len(slots)
+            return len(data.get("feed_plan") or ())
         if self.entity_description.key == "firmware_version":
             return data.get("device_version") or None
-        return None
+        return data.get(self.entity_description.key)
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Expose schedule slots / device info in attributes."""
         data = self.coordinator.data or {}
-        attrs: dict[str, Any] = {}
-        if self.entity_description.key == "feed_plan" and "feed_plan_slots" in data:
-            attrs["slots"] = data["feed_plan_slots"]
+        if self.entity_description.key == "feed_plan" and "feed_plan" in data:
+            # Slot dicts are rebuilt only when the plan content changes
+            content = hash(data["feed_plan"])
+            if self._attrs_cache is None or self._attrs_cache[0] != content:
+                self._attrs_cache = (
+                    content,
+                    {"slots": [slot.as_dict() for slot in data["feed_plan"]]},
+                )
+            return self._attrs_cache[1]
         if self.entity_description.key == "firmware_version" and data.get("device_name"):
-            attrs["device_name"] = data["device_name"]
-        return attrs
+            return {"device_name": data["device_name"]}
+        return {}
+
+
+class NetizenFleetSensor(SensorEntity):
+    """Total across all Netizen BLE feeders, pushed by the fleet aggregator."""
+
+    entity_description: NetizenFleetSensorEntityDescription
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+
+    def __init__(
+        self, fleet: NetizenBLEFleet, description: NetizenFleetSensorEntityDescription
+    ) -> None:
+        self._fleet = fleet
+        self.entity_description = description
+        self._attr_unique_id = f"{DOMAIN}_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, "fleet")},
+            name="Pet Netizen fleet",
+            manufacturer="Pet Netizen",
+            model="Fleet summary",
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(self._fleet.async_add_listener(self._async_fleet_changed))
+
+    @callback
+    def _async_fleet_changed(self, changed: set[str]) -> None:
+        if not changed.isdisjoint(self.entity_description.watch):
+            self.async_write_ha_state()
+
+    @property
+    def native_value(self) -> Any:
+        return self.entity_description.value_fn(self._fleet)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        return self.entity_description.attrs_fn(self._fleet)
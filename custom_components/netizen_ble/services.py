@@ -0,0 +1,194 @@
+"""Domain services, registered once and dispatched through a device_id index."""
+
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+
+import voluptuous as vol
+from homeassistant.const import CONF_DEVICE_ID
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+
+from . import group
+from .const import DATA_DEVICES, DOMAIN
+from .coordinator import NetizenBLECoordinator
+from .schedule import MAX_PORTIONS, MIN_PORTIONS, feed_slot
+from .settings import settings_profile
+from .training import TrainingPlan
+
+type FeederHandler = Callable[[NetizenBLECoordinator, ServiceCall], Awaitable[ServiceResponse]]
+
+SET_FEED_PLAN_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_DEVICE_ID): str,
+        vol.Required("schedule"): [
+            vol.All(
+                vol.Schema(
+                    {
+                        vol.Required("weekdays"): vol.Any(str, [str]),
+                        vol.Required("time"): str,
+                        vol.Optional("portions", default=1): vol.All(
+                            vol.Coerce(int), vol.Range(MIN_PORTIONS, MAX_PORTIONS)
+                        ),
+                        vol.Optional("enabled", default=True): bool,
+                    }
+                ),
+                feed_slot,
+            )
+        ],
+    }
+)
+
+FEED_GROUP_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_DEVICE_ID): vol.All(cv.ensure_list, [str]),
+        vol.Optional("portions"): vol.All(vol.Coerce(int), vol.Range(MIN_PORTIONS, MAX_PORTIONS)),
+    }
+)
+
+APPLY_SETTINGS_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_DEVICE_ID): vol.All(cv.ensure_list, [str]),
+        vol.Required("settings"): settings_profile,
+    }
+)
+
+START_TRAINING_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_DEVICE_ID): str,
+        vol.Required("rewards"): vol.All(vol.Coerce(int), vol.Range(1, 100)),
+        vol.Required("interval"): vol.All(vol.Coerce(float), vol.Range(1, 3600)),
+        vol.Optional("jitter", default=0.0): vol.All(vol.Coerce(float), vol.Range(0)),
+        vol.Optional("max_duration"): vol.All(vol.Coerce(float), vol.Range(1, 86400)),
+        vol.Optional("max_failures", default=3): vol.All(vol.Coerce(int), vol.Range(1, 20)),
+    }
+)
+
+STOP_TRAINING_SCHEMA = vol.Schema({vol.Required(CONF_DEVICE_ID): str})
+
+
+def async_index_device(
+    hass: HomeAssistant, device_id: str, coordinator: NetizenBLECoordinator
+) -> Callable[[], None]:
+    """Make a loaded feeder reachable by its device registry id; return the remover."""
+    index: dict[str, NetizenBLECoordinator] = hass.data.setdefault(DATA_DEVICES, {})
+    index[device_id] = coordinator
+
+    def _remove() -> None:
+        if index.get(device_id) is coordinator:
+            del index[device_id]
+
+    return _remove
+
+
+def async_get_coordinator(hass: HomeAssistant, device_id: str) -> NetizenBLECoordinator:
+    """Return the coordinator of a loaded feeder, or raise for the caller to show."""
+    if coordinator := hass.data.get(DATA_DEVICES, {}).get(device_id):
+        return coordinator
+    raise ServiceValidationError(f"Device {device_id} is not a loaded Netizen BLE feeder")
+
+
+def _async_get_coordinators(call: ServiceCall) -> list[NetizenBLECoordinator]:
+    """Coordinators for a list of device ids; a feeder listed twice is included once."""
+    return [
+        async_get_coordinator(call.hass, device_id)
+        for device_id in dict.fromkeys(call.data[CONF_DEVICE_ID])
+    ]
+
+
+def _feeder_service(handler: FeederHandler) -> Callable[[ServiceCall], Awaitable[ServiceResponse]]:
+    """Adapt a handler taking the coordinator of call.data[device_id] to a service handler."""
+
+    async def _async_handle(call: ServiceCall) -> ServiceResponse:
+        return await handler(async_get_coordinator(call.hass, call.data[CONF_DEVICE_ID]), call)
+
+    return _async_handle
+
+
+async def _async_set_feed_plan(coord: NetizenBLECoordinator, call: ServiceCall) -> None:
+    """Service: set_feed_plan(device_id, schedule). schedule: FeedSlots validated by the schema."""
+    await coord.async_set_feed_plan(call.data["schedule"])
+    await coord.async_request_refresh()
+
+
+async def _async_start_training(coord: NetizenBLECoordinator, call: ServiceCall) -> ServiceResponse:
+    """Service: start_training(device_id, rewards, interval, ...). DU-PD01 reward sequence."""
+    try:
+        plan = TrainingPlan(
+            rewards=call.data["rewards"],
+            interval=call.data["interval"],
+            jitter=call.data["jitter"],
+            max_duration=call.data.get("max_duration"),
+            max_failures=call.data["max_failures"],
+        )
+    except ValueError as err:
+        raise ServiceValidationError(str(err)) from err
+    # Checked before returning, so a session that cannot start fails the call
+    session = coord.async_start_training(plan)
+    if call.return_response:
+        return await coord.async_run_training(session)
+    call.hass.async_create_background_task(
+        coord.async_run_training(session), f"{DOMAIN} training {coord.device.address}"
+    )
+    return None
+
+
+async def _async_stop_training(coord: NetizenBLECoordinator, call: ServiceCall) -> None:
+    """Service: stop_training(device_id). Ends a running training session."""
+    coord.async_stop_training()
+
+
+async def _async_feed_group(call: ServiceCall) -> ServiceResponse:
+    """Service: feed_group(device_id: [...], portions). Feeds all feeders at once."""
+    coordinators = _async_get_coordinators(call)
+    result = await group.async_feed_group(call.hass, coordinators, call.data.get("portions"))
+    return result if call.return_response else None
+
+
+async def _async_apply_settings(call: ServiceCall) -> ServiceResponse:
+    """Service: apply_settings(device_id: [...], settings). Writes only changed settings."""
+    coordinators = _async_get_coordinators(call)
+    result = await group.async_apply_settings(call.hass, coordinators, call.data["settings"])
+    return result if call.return_response else None
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the domain services; they dispatch to whichever feeders are loaded."""
+    hass.services.async_register(
+        DOMAIN,
+        "set_feed_plan",
+        _feeder_service(_async_set_feed_plan),
+        SET_FEED_PLAN_SCHEMA,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        "feed_group",
+        _async_feed_group,
+        FEED_GROUP_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        "apply_settings",
+        _async_apply_settings,
+        APPLY_SETTINGS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        "start_training",
+        _feeder_service(_async_start_training),
+        START_TRAINING_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        "stop_training",
+        _feeder_service(_async_stop_training),
+        STOP_TRAINING_SCHEMA,
+    )
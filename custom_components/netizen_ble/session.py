@@ -0,0 +1,114 @@
+"""Authenticated feeder sessions shared by the config flow and entry setup."""
+
+from __future__ import annotations
+
+import importlib
+import logging
+import sys
+
+from homeassistant.components import bluetooth
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
+
+from .const import DATA_SESSIONS, SESSION_HANDOFF_TIMEOUT
+from .device import NetizenBLEDevice
+
+# Loaded on first connect rather than with the integration
+BACKEND_MODULES = ("petnetizen_feeder", "bleak_retry_connector")
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CannotConnect(HomeAssistantError):
+    """Feeder not found or connection failed."""
+
+
+class InvalidAuth(HomeAssistantError):
+    """Feeder rejected the verification code."""
+
+
+def normalize_address(address: str) -> str:
+    """Return an upper-case, colon separated MAC address."""
+    address = address.strip().upper().replace("-", ":")
+    if len(address) == 12 and ":" not in address:
+        address = ":".join(address[i : i + 2] for i in range(0, 12, 2))
+    return address
+
+
+async def async_load_backend(hass: HomeAssistant) -> None:
+    """Import the feeder library and BLE connector in the import executor, once."""
+    for name in BACKEND_MODULES:
+        if name not in sys.modules:
+            await hass.async_add_import_executor_job(importlib.import_module, name)
+
+
+async def async_open_session(
+    hass: HomeAssistant,
+    address: str,
+    verification_code: str,
+    device_type: str | None = None,
+    name: str | None = None,
+) -> NetizenBLEDevice:
+    """Connect and authenticate; raise CannotConnect or InvalidAuth."""
+    await async_load_backend(hass)
+    from bleak import BleakClient
+    from bleak.exc import BleakError
+    from bleak_retry_connector import BleakNotFoundError, establish_connection, get_device
+
+    ble_device = bluetooth.async_ble_device_from_address(hass, address, True) or await get_device(
+        address
+    )
+    if not ble_device:
+        raise CannotConnect(f"Could not find feeder with address {address}")
+    try:
+        ble_client = await establish_connection(
+            BleakClient, ble_device, name or f"Pet Netizen {address[-8:].replace(':', '')}"
+        )
+    except (BleakError, BleakNotFoundError, TimeoutError) as err:
+        raise CannotConnect(f"Could not connect to feeder {address}: {err}") from err
+
+    device = NetizenBLEDevice(address, verification_code=verification_code, device_type=device_type)
+    if not await device.connect(ble_client=ble_client):
+        # connect() releases the link it got; make sure the adapter slot is freed either way
+        try:
+            await ble_client.disconnect()
+        except BleakError as err:
+            _LOGGER.debug("Disconnect after failed connect to %s: %s", address, err)
+        if device.auth_failed:
+            raise InvalidAuth(f"Feeder {address} rejected the verification code")
+        raise CannotConnect(f"Could not connect to feeder {address}")
+    return device
+
+
+@callback
+def async_store_session(hass: HomeAssistant, device: NetizenBLEDevice) -> None:
+    """Keep a validated session for entry setup; close it if setup does not claim it."""
+    sessions: dict[str, tuple[NetizenBLEDevice, CALLBACK_TYPE]] = hass.data.setdefault(
+        DATA_SESSIONS, {}
+    )
+    if previous := sessions.pop(device.address, None):
+        previous[1]()
+        hass.async_create_task(previous[0].disconnect())
+
+    @callback
+    def _expire(_now: object) -> None:
+        if sessions.get(device.address, (None,))[0] is device:
+            del sessions[device.address]
+            _LOGGER.debug("Unclaimed session for %s expired", device.address)
+            hass.async_create_task(device.disconnect())
+
+    sessions[device.address] = (device, async_call_later(hass, SESSION_HANDOFF_TIMEOUT, _expire))
+
+
+@callback
+def async_pop_session(hass: HomeAssistant, address: str) -> NetizenBLEDevice | None:
+    """Take over a session opened by the config flow, if it is still connected."""
+    if not (pending := hass.data.get(DATA_SESSIONS, {}).pop(address, None)):
+        return None
+    device, cancel_expire = pending
+    cancel_expire()
+    if device.is_connected:
+        return device
+    hass.async_create_task(device.disconnect())
+    return None
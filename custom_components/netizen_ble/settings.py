@@ -0,0 +1,118 @@
+"""Feeder settings profiles shared by the apply_settings service and the device wrapper."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass, fields
+from typing import Any
+
+import voluptuous as vol
+
+from .const import AUTO_LOCK, DND, LED_CTRL, LONG_RING, MOOD_LIGHT
+from .schedule import parse_time
+
+# Profile field -> data point written for it, in the order they are sent
+SETTING_COMMANDS = {
+    "led": LED_CTRL,
+    "auto_lock": AUTO_LOCK,
+    "mood_light": MOOD_LIGHT,
+    "long_ring": LONG_RING,
+    "do_not_disturb": DND,
+}
+# Settings written as a single on/off byte
+SWITCHES = ("led", "auto_lock", "mood_light", "long_ring")
+
+
+@dataclass(frozen=True, slots=True)
+class DoNotDisturb:
+    """Do-not-disturb window: enabled flag and start / end minute of day."""
+
+    enabled: bool
+    start: int = 22 * 60
+    end: int = 8 * 60
+
+    @classmethod
+    def from_dict(cls, data: Any) -> DoNotDisturb:
+        if isinstance(data, DoNotDisturb):
+            return data
+        if not isinstance(data, Mapping) or "enabled" not in data:
+            raise ValueError("do_not_disturb requires enabled")
+        return cls(
+            enabled=bool(data["enabled"]),
+            start=parse_time(data.get("start", "22:00")),
+            end=parse_time(data.get("end", "08:00")),
+        )
+
+    def payload(self) -> bytes:
+        """0x18 payload: enabled, start hour, start minute, end hour, end minute."""
+        return bytes((int(self.enabled), *divmod(self.start, 60), *divmod(self.end, 60)))
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "start": f"{self.start // 60:02d}:{self.start % 60:02d}",
+            "end": f"{self.end // 60:02d}:{self.end % 60:02d}",
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class SettingsProfile:
+    """Settings to apply to a feeder; None leaves a setting as it is."""
+
+    led: bool | None = None
+    auto_lock: bool | None = None
+    mood_light: bool | None = None
+    long_ring: bool | None = None
+    do_not_disturb: DoNotDisturb | None = None
+
+    @classmethod
+    def from_dict(cls, data: Any) -> SettingsProfile:
+        """Parse a user-supplied profile; raise ValueError for unknown or empty ones."""
+        if isinstance(data, SettingsProfile):
+            return data
+        if not isinstance(data, Mapping):
+            raise ValueError("settings must be a mapping")
+        if unknown := set(data) - set(SETTING_COMMANDS):
+            raise ValueError(f"unknown setting(s): {', '.join(sorted(unknown))}")
+        switches = {key: data[key] for key in SWITCHES if key in data}
+        for key, value in switches.items():
+            if not isinstance(value, bool):
+                raise ValueError(f"{key} must be true or false, got {value!r}")
+        dnd = data.get("do_not_disturb")
+        profile = cls(
+            **switches, do_not_disturb=DoNotDisturb.from_dict(dnd) if dnd is not None else None
+        )
+        if not profile.values():
+            raise ValueError("settings profile is empty")
+        return profile
+
+    def values(self) -> dict[str, Any]:
+        """Return the settings this profile sets, in send order."""
+        return {
+            field.name: value
+            for field in fields(self)
+            if (value := getattr(self, field.name)) is not None
+        }
+
+    def changes(self, current: Mapping[str, Any]) -> dict[str, Any]:
+        """Return the settings that differ from (or are missing in) the current state."""
+        return {key: value for key, value in self.values().items() if current.get(key) != value}
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            key: value.as_dict() if isinstance(value, DoNotDisturb) else value
+            for key, value in self.values().items()
+        }
+
+
+def setting_payload(value: Any) -> bytes:
+    """Return the data point payload for one profile setting."""
+    return value.payload() if isinstance(value, DoNotDisturb) else bytes((int(value),))
+
+
+def settings_profile(value: Any) -> SettingsProfile:
+    """Voluptuous validator for the apply_settings settings field."""
+    try:
+        return SettingsProfile.from_dict(value)
+    except ValueError as err:
+        raise vol.Invalid(str(err)) from err
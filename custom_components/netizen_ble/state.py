@@ -0,0 +1,70 @@
+"""Compact per-device state and the read-only mapping view handed to listeners."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Any
+
+from .schedule import FeedPlan
+from .settings import DoNotDisturb
+
+
+@dataclass(slots=True)
+class DeviceState:
+    """Values last read from (or written to) a feeder; None until known."""
+
+    device_name: str | None = None
+    device_version: str | None = None
+    feed_plan: FeedPlan | None = None
+    child_lock: bool | None = None
+    prompt_sound: bool | None = None
+    power_mode: str | None = None
+    battery_level: int | None = None
+    battery_low_at: datetime | None = None
+    train_count: int | None = None
+    led: bool | None = None
+    auto_lock: bool | None = None
+    mood_light: bool | None = None
+    long_ring: bool | None = None
+    do_not_disturb: DoNotDisturb | None = None
+
+    def clear(self) -> None:
+        for key in STATE_KEYS:
+            setattr(self, key, None)
+
+
+STATE_KEYS = tuple(field.name for field in fields(DeviceState))
+_KEYS = frozenset(STATE_KEYS)
+
+
+class StateView(Mapping[str, Any]):
+    """Read-only mapping over a DeviceState and its optimistic overrides.
+
+    One view per device is shared by every listener and the coordinator, so a
+    notification copies nothing. Keys whose value is None are absent.
+    """
+
+    __slots__ = ("_overrides", "_state")
+
+    def __init__(self, state: DeviceState, overrides: Mapping[str, Any]) -> None:
+        self._state = state
+        self._overrides = overrides
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._overrides:
+            return self._overrides[key]
+        value = getattr(self._state, key) if key in _KEYS else None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return (key for key in STATE_KEYS if key in self)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"StateView({dict(self)!r})"
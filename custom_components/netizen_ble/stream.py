@@ -0,0 +1,110 @@
+"""Latest-wins write pipeline for continuous controls (Du-TC02 joystick and color)."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+# Writes kept for the rate/latency statistics
+STATS_WINDOW = 64
+# Floor between two writes; proxies drop write-without-response packets sent back to back
+MIN_WRITE_INTERVAL = 0.02
+
+
+class ControlStream:
+    """Coalesce high-rate control updates and write only the newest value per channel.
+
+    submit() never waits: it replaces the pending value of its channel and wakes the
+    writer task. The writer sends one frame at a time, so the link paces the stream
+    and intermediate values that were superseded while a write was in flight are dropped.
+    """
+
+    def __init__(self, name: str, write: Callable[[bytes], Awaitable[None]]) -> None:
+        self._name = name
+        self._write = write
+        # channel -> (frame, submit time); dicts keep insertion order, so channels take turns
+        self._pending: dict[str, tuple[bytes, float]] = {}
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._submitted = 0
+        self._written = 0
+        self._failed = 0
+        self._sent_at: deque[float] = deque(maxlen=STATS_WINDOW)
+        self._latency: deque[float] = deque(maxlen=STATS_WINDOW)
+
+    @property
+    def active(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def submit(self, channel: str, frame: bytes) -> None:
+        """Queue frame as the latest value for channel; starts the writer if idle."""
+        self._pending.pop(channel, None)
+        self._pending[channel] = (frame, time.monotonic())
+        self._submitted += 1
+        self._wake.set()
+        if not self.active:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Drop pending values and stop the writer."""
+        self._pending.clear()
+        if self._submitted:
+            _LOGGER.debug("%s: control stream stopped: %s", self._name, self.stats)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        last = 0.0
+        while True:
+            if not self._pending:
+                self._wake.clear()
+                await self._wake.wait()
+            if (delay := last + MIN_WRITE_INTERVAL - time.monotonic()) > 0:
+                await asyncio.sleep(delay)
+            channel = next(iter(self._pending))
+            frame, submitted = self._pending.pop(channel)
+            try:
+                await self._write(frame)
+            except Exception as e:
+                self._failed += 1
+                _LOGGER.debug("%s: stream write %s failed: %s", self._name, channel, e)
+                continue
+            finally:
+                last = time.monotonic()
+            self._written += 1
+            self._sent_at.append(last)
+            self._latency.append(last - submitted)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Achieved write rate and submit-to-written latency over the last writes."""
+        rate = None
+        if len(self._sent_at) > 1 and self._sent_at[-1] > self._sent_at[0]:
+            rate = round((len(self._sent_at) - 1) / (self._sent_at[-1] - self._sent_at[0]), 1)
+        latencies = sorted(self._latency)
+        return {
+            "submitted": self._submitted,
+            "written": self._written,
+            "superseded": self._submitted - self._written - self._failed - len(self._pending),
+            "failed": self._failed,
+            "rate_hz": rate,
+            "latency_ms_mean": (
+                round(sum(latencies) / len(latencies) * 1000, 1) if latencies else None
+            ),
+            "latency_ms_p95": (
+                round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 1)
+                if latencies
+                else None
+            ),
+        }
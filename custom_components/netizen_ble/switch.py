@@ -10,10 +10,10 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
 from .coordinator import NetizenBLECoordinator
+from .entity import NetizenBLEEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -47,9 +47,11 @@ async def async_setup_entry(
     async_add_entities(entities)
 
 
-class NetizenBLESwitch(CoordinatorEntity[NetizenBLECoordinator], SwitchEntity):
+class NetizenBLESwitch(NetizenBLEEntity, SwitchEntity):
     """Netizen BLE switch (child lock, prompt sound, or manual feed trigger)."""
 
+    _queues_commands = True
+
     def __init__(
         self,
         coordinator: NetizenBLECoordinator,
@@ -58,17 +60,10 @@ class NetizenBLESwitch(CoordinatorEntity[NetizenBLECoordinator], SwitchEntity):
         *,
         is_feed: bool = False,
     ) -> None:
-        super().__init__(coordinator)
-        self._device = coordinator.device
-        self._attr_device_info = device_info
-        self.entity_description = description
-        self._attr_unique_id = f"{self._device.address}_{description.key}"
-        self._attr_has_entity_name = True
+        super().__init__(coordinator, device_info, description)
         self._is_feed = is_feed
-
-    @property
-    def available(self) -> bool:
-        return self.coordinator.connected
+        if not is_feed:
+            self._state_keys = (self._state_key(),)
 
     def _state_key(self) -> str:
         key = self.entity_description.key
@@ -87,14 +82,13 @@ class NetizenBLESwitch(CoordinatorEntity[NetizenBLECoordinator], SwitchEntity):
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         if self._is_feed:
-            portions = getattr(self.coordinator, "_feed_portions", 1) or 1
-            await self._device.trigger_feed(portions=portions)
+            await self.coordinator.async_feed(self.coordinator.feed_portions)
             return
         key = self._state_key()
         if key == "child_lock":
-            await self._device.set_child_lock(True)
+            await self.coordinator.async_set_child_lock(True)
         elif key == "prompt_sound":
-            await self._device.set_prompt_sound(True)
+            await self.coordinator.async_set_prompt_sound(True)
         self.coordinator.hass.async_create_task(self.coordinator.async_request_refresh())
 
     async def async_turn_off(self, **kwargs: Any) -> None:
@@ -102,7 +96,7 @@ class NetizenBLESwitch(CoordinatorEntity[NetizenBLECoordinator], SwitchEntity):
             return
         key = self._state_key()
         if key == "child_lock":
-            await self._device.set_child_lock(False)
+            await self.coordinator.async_set_child_lock(False)
         elif key == "prompt_sound":
-            await self._device.set_prompt_sound(False)
+            await self.coordinator.async_set_prompt_sound(False)
         self.coordinator.hass.async_create_task(self.coordinator.async_request_refresh())
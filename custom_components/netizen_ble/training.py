@@ -0,0 +1,127 @@
+"""Host-timed DU-PD01 training sessions: a sequence of rewards over one connection."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from dataclasses import dataclass
+from typing import Any
+
+from .device import NetizenBLEDevice
+
+_LOGGER = logging.getLogger(__name__)
+
+# Longest idle stretch on the link while waiting for a reward; polling is paused meanwhile
+KEEPALIVE_INTERVAL = 30.0
+# No keep-alive this close to a reward, so it cannot delay the reward frame
+KEEPALIVE_MARGIN = 2.0
+
+
+@dataclass(frozen=True, slots=True)
+class TrainingPlan:
+    """Rewards to dispense: count, seconds between them, +/- jitter and stop conditions."""
+
+    rewards: int
+    interval: float
+    jitter: float = 0.0
+    max_duration: float | None = None
+    max_failures: int = 3
+
+    def __post_init__(self) -> None:
+        if self.rewards < 1 or self.interval <= 0:
+            raise ValueError("a training plan needs at least one reward and a positive interval")
+        if not 0 <= self.jitter * 2 < self.interval:
+            raise ValueError("jitter must be less than half the interval")
+
+
+class TrainingSession:
+    """Dispense the rewards of a plan at their scheduled times.
+
+    Each reward is due at an absolute time computed from the session start, so
+    write time does not accumulate into drift. Polling is paused, so long waits
+    send a keep-alive every KEEPALIVE_INTERVAL seconds, and a dropped link is
+    reconnected before the next reward. train_count is read once when it ends.
+    """
+
+    def __init__(
+        self, device: NetizenBLEDevice, plan: TrainingPlan, rng: random.Random | None = None
+    ) -> None:
+        self._device = device
+        self._plan = plan
+        self._rng = rng or random.Random()
+        self._stop = asyncio.Event()
+        self.sent = 0
+
+    @property
+    def plan(self) -> TrainingPlan:
+        return self._plan
+
+    def stop(self) -> None:
+        """End the session before the next reward."""
+        self._stop.set()
+
+    async def _wait_until(self, when: float) -> bool:
+        """Sleep until the loop time `when`, keeping the link warm; False if stopped."""
+        loop = asyncio.get_running_loop()
+        while True:
+            delay = when - loop.time()
+            step = min(delay, KEEPALIVE_INTERVAL)
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=max(0.0, step))
+            except TimeoutError:
+                if when - loop.time() <= KEEPALIVE_MARGIN:
+                    return True
+                await self._device.keep_alive()
+                continue
+            return False
+
+    async def async_run(self) -> dict[str, Any]:
+        plan = self._plan
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        errors_ms: list[float] = []
+        failures = consecutive = 0
+        reason = "completed"
+        for index in range(plan.rewards):
+            due = start + index * plan.interval
+            if index:
+                due += self._rng.uniform(-plan.jitter, plan.jitter)
+            if plan.max_duration is not None and due - start > plan.max_duration:
+                reason = "max_duration"
+                break
+            if not await self._wait_until(due):
+                reason = "stopped"
+                break
+            connected = await self._device.ensure_connected()
+            if self._stop.is_set():
+                reason = "stopped"
+                break
+            if connected:
+                errors_ms.append((loop.time() - due) * 1000)
+                ok = await self._device.dispense_reward()
+            else:
+                ok = False
+            if ok:
+                self.sent += 1
+                consecutive = 0
+                continue
+            failures += 1
+            consecutive += 1
+            if consecutive >= plan.max_failures:
+                reason = "failures"
+                break
+
+        result: dict[str, Any] = {
+            "reason": reason,
+            "rewards_sent": self.sent,
+            "failures": failures,
+            "duration_s": round(loop.time() - start, 3),
+            "timing_error_ms_mean": (
+                round(sum(errors_ms) / len(errors_ms), 1) if errors_ms else None
+            ),
+            "timing_error_ms_max": round(max(errors_ms), 1) if errors_ms else None,
+            "train_count": await self._device.query_train_count(),
+        }
+        _LOGGER.debug("Training session on %s ended: %s", self._device.address, result)
+        return result
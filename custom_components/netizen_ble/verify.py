@@ -0,0 +1,207 @@
+"""Scheduled feed verification: match feed reports against the local copy of the plan."""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import issue_registry as ir
+from homeassistant.helpers.event import async_track_point_in_time
+from homeassistant.util import dt as dt_util
+
+from .activity import FEED_STATE_ERROR, FEED_STATE_FEEDING, feed_record
+from .const import DOMAIN, MANUAL_FEED_RESULT, PLAN_FEED_RESULT
+from .device import NetizenBLEDevice
+from .schedule import FeedPlan, FeedSlot, next_slot
+
+_LOGGER = logging.getLogger(__name__)
+
+EVENT_SCHEDULED_FEED = f"{DOMAIN}_scheduled_feed"
+
+# Observation window around each slot; the feeder clock may drift from ours a little
+WINDOW_BEFORE = timedelta(minutes=1)
+WINDOW_AFTER = timedelta(minutes=5)
+# Extra wait when the feeder is still dispensing as the window closes
+DISPENSING_GRACE = timedelta(minutes=1)
+# Records carry their own feed type, so plan feeds are looked for in both report frames
+REPORT_COMMANDS = frozenset(int(cmd, 16) for cmd in (PLAN_FEED_RESULT, MANUAL_FEED_RESULT))
+
+
+def _in_window(fed_at: str | None, scheduled: datetime) -> bool:
+    """Whether a report's feeder timestamp falls in the slot's window (unknown times do)."""
+    if fed_at is None:
+        return True
+    return scheduled - WINDOW_BEFORE <= datetime.fromisoformat(fed_at) <= scheduled + WINDOW_AFTER
+
+
+class FeedVerifier:
+    """Check that each scheduled feed of one feeder happened.
+
+    Nothing runs between slots. A window opens WINDOW_BEFORE each slot of the
+    last known plan and closes WINDOW_AFTER it; only while it is open are
+    notification frames read for plan feed reports. A window without a report
+    costs one feed_state query when it closes, and only if the feeder is
+    connected. Missed and failed feeds raise a repair issue, which the next
+    verified feed clears; every outcome fires EVENT_SCHEDULED_FEED.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        device: NetizenBLEDevice,
+        fire: Callable[[str, dict[str, Any]], None],
+    ) -> None:
+        self._hass = hass
+        self._device = device
+        self._fire = fire
+        self._plan: FeedPlan = ()
+        self._slot: tuple[datetime, FeedSlot] | None = None
+        # Last slot an outcome was reported for, so it is not watched twice
+        self._done: datetime | None = None
+        self._report: dict[str, Any] | None = None
+        self._extended = False
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._unsub_frames: CALLBACK_TYPE | None = None
+
+    @property
+    def _issue_id(self) -> str:
+        return f"scheduled_feed_{self._device.address.replace(':', '').lower()}"
+
+    @callback
+    def async_update_plan(self, plan: FeedPlan | None) -> None:
+        """Follow the feeder's plan; None (state not read yet or cleared) keeps the last one."""
+        if plan is None or plan == self._plan:
+            return
+        self._plan = plan
+        if self._unsub_frames is None:
+            # An open window finishes with the slot it was opened for
+            self._arm()
+
+    @callback
+    def async_stop(self) -> None:
+        self._close_window()
+        if self._unsub_timer:
+            self._unsub_timer()
+            self._unsub_timer = None
+        self._slot = None
+
+    def _arm(self) -> None:
+        """Wait for the first slot after now and after the one last reported."""
+        if self._unsub_timer:
+            self._unsub_timer()
+            self._unsub_timer = None
+        if self._device.v2_protocol:
+            # V2 models send no feed reports this verifier can read
+            self._slot = None
+            return
+        now = dt_util.now()
+        self._slot = next_slot(self._plan, max(now, self._done) if self._done else now)
+        if self._slot is not None:
+            self._unsub_timer = async_track_point_in_time(
+                self._hass, self._async_open, self._slot[0] - WINDOW_BEFORE
+            )
+
+    @callback
+    def _async_open(self, _now: datetime) -> None:
+        assert self._slot is not None
+        self._report = None
+        self._extended = False
+        self._unsub_frames = self._device.subscribe_frames(self._on_frame)
+        self._unsub_timer = async_track_point_in_time(
+            self._hass, self._async_window_end, self._slot[0] + WINDOW_AFTER
+        )
+
+    def _close_window(self) -> None:
+        if self._unsub_frames:
+            self._unsub_frames()
+            self._unsub_frames = None
+
+    @callback
+    def _on_frame(self, frame: bytes) -> None:
+        if len(frame) < 4 or frame[1] not in REPORT_COMMANDS or self._slot is None:
+            return
+        scheduled = self._slot[0].replace(tzinfo=None)  # feeder time is local and naive
+        payload = frame[3 : 3 + frame[2]]
+        for offset in range(0, len(payload) - 8, 9):
+            report = feed_record(payload[offset : offset + 9], frame[1])
+            if report["source"] == "plan" and _in_window(report["fed_at"], scheduled):
+                self._report = report
+                if report["success"]:
+                    self._finish("fed")
+                return
+
+    @callback
+    def _async_window_end(self, _now: datetime) -> None:
+        self._unsub_timer = None
+        if self._report is not None:
+            self._finish("failed")
+            return
+        if not self._device.is_connected:
+            self._finish("unknown")
+            return
+        self._hass.async_create_background_task(
+            self._async_check_feed_state(), f"{DOMAIN} verify {self._device.address}"
+        )
+
+    async def _async_check_feed_state(self) -> None:
+        """No report in the window: ask the feeder once whether it is dispensing or jammed."""
+        slot = self._slot
+        status = await self._device.query_feed_state()
+        if self._slot is not slot:
+            return  # stopped, or a successful report came in meanwhile
+        if self._report is not None:
+            self._finish("failed")
+        elif status == FEED_STATE_FEEDING and not self._extended:
+            self._extended = True
+            self._unsub_timer = async_track_point_in_time(
+                self._hass, self._async_window_end, dt_util.now() + DISPENSING_GRACE
+            )
+        elif status == FEED_STATE_ERROR:
+            self._finish("failed")
+        else:
+            self._finish("missed" if status is not None else "unknown")
+
+    def _finish(self, status: str) -> None:
+        """Report the outcome of the current slot and wait for the next one."""
+        self._close_window()
+        if self._unsub_timer:
+            self._unsub_timer()
+            self._unsub_timer = None
+        if self._slot is None:
+            return
+        scheduled, slot = self._slot
+        report = self._report or {}
+        _LOGGER.debug("Scheduled feed at %s on %s: %s", scheduled, self._device.address, status)
+        self._fire(
+            EVENT_SCHEDULED_FEED,
+            {
+                "status": status,
+                "scheduled": scheduled.isoformat(),
+                "portions": slot.portions,
+                "portions_fed": report.get("portions"),
+                "fed_at": report.get("fed_at"),
+            },
+        )
+        if status == "fed":
+            ir.async_delete_issue(self._hass, DOMAIN, self._issue_id)
+        elif status in ("missed", "failed"):
+            ir.async_create_issue(
+                self._hass,
+                DOMAIN,
+                self._issue_id,
+                is_fixable=False,
+                severity=ir.IssueSeverity.WARNING,
+                translation_key=f"scheduled_feed_{status}",
+                translation_placeholders={
+                    "name": self._device.name,
+                    "time": scheduled.strftime("%Y-%m-%d %H:%M"),
+                },
+            )
+        self._report = None
+        self._done = scheduled
+        self._arm()
+        if status == "fed":
+            self._device.record_scheduled_feed()
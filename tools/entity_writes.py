@@ -0,0 +1,140 @@
+"""Count entity state writes caused by coordinator updates across many feeders.
+
+Builds the integration's coordinators and entities for N simulated feeders (no
+BLE stack, no state machine) and pushes U coordinator updates per feeder. Most
+updates are polls that return the same state; some change one key. Each entity
+is driven twice, once with the integration's change filtering and once with the
+plain CoordinatorEntity behaviour (write on every update). Reports writes and the
+attribute bytes a recorder would have serialized for each.
+
+Usage (inside a Home Assistant dev environment):
+
+    python tools/entity_writes.py
+    python tools/entity_writes.py --feeders 50 --updates 500 --change-rate 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from custom_components.netizen_ble.button import BUTTONS, NetizenBLEButton  # noqa: E402
+from custom_components.netizen_ble.coordinator import NetizenBLECoordinator  # noqa: E402
+from custom_components.netizen_ble.device import NetizenBLEDevice  # noqa: E402
+from custom_components.netizen_ble.number import PORTIONS_DESC, NetizenBLENumber  # noqa: E402
+from custom_components.netizen_ble.schedule import FeedSlot  # noqa: E402
+from custom_components.netizen_ble.sensor import SENSORS, NetizenBLESensor  # noqa: E402
+from custom_components.netizen_ble.switch import SWITCHES, NetizenBLESwitch  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.helpers.update_coordinator import CoordinatorEntity  # noqa: E402
+
+
+class Counter:
+    def __init__(self) -> None:
+        self.writes = 0
+        self.attr_bytes = 0
+
+
+def _entities(coordinator: NetizenBLECoordinator) -> list[Any]:
+    info: Any = {"identifiers": {("netizen_ble", coordinator.device.address)}}
+    return [
+        *(NetizenBLESensor(coordinator, info, desc) for desc in SENSORS),
+        *(
+            NetizenBLESwitch(coordinator, info, desc, is_feed=desc.key == "manual_feed")
+            for desc in SWITCHES
+        ),
+        *(NetizenBLEButton(coordinator, info, desc) for desc in BUTTONS),
+        NetizenBLENumber(coordinator, info, PORTIONS_DESC),
+    ]
+
+
+def _attach(entity: Any, counter: Counter, filtered: bool) -> None:
+    def write() -> None:
+        counter.writes += 1
+        counter.attr_bytes += len(json.dumps(entity.extra_state_attributes or {}, default=str))
+
+    entity.async_write_ha_state = write
+    entity._written = entity._fingerprint()  # noqa: SLF001 - as after async_added_to_hass
+    handler = (
+        entity._handle_coordinator_update  # noqa: SLF001
+        if filtered
+        else lambda: CoordinatorEntity._handle_coordinator_update(entity)  # noqa: SLF001
+    )
+    entity.coordinator.async_add_listener(handler)
+
+
+def _plan(rng: random.Random) -> tuple[FeedSlot, ...]:
+    return tuple(
+        FeedSlot(
+            weekdays=rng.randint(1, 0x7F), minute=rng.randrange(1440), portions=rng.randint(1, 15)
+        )
+        for _ in range(rng.randint(4, 10))
+    )
+
+
+async def run(feeders: int, updates: int, change_rate: float, seed: int) -> dict[str, Counter]:
+    hass = HomeAssistant(tempfile.mkdtemp())
+    counters = {"filtered": Counter(), "unfiltered": Counter()}
+    rng = random.Random(seed)
+    coordinators = []
+    for index in range(feeders):
+        device = NetizenBLEDevice(f"AA:BB:CC:DD:{index // 256:02X}:{index % 256:02X}")
+        # One coordinator per mode so both see the same sequence of data
+        pair = [NetizenBLECoordinator(hass, device) for _ in counters]
+        for coordinator, (mode, counter) in zip(pair, counters.items(), strict=True):
+            for entity in _entities(coordinator):
+                entity.hass = hass
+                _attach(entity, counter, mode == "filtered")
+        coordinators.append(pair)
+
+    states = [
+        {
+            "feed_plan": _plan(rng),
+            "child_lock": False,
+            "prompt_sound": True,
+            "device_version": "1.0",
+            "device_name": "Du-W1",
+        }
+        for _ in range(feeders)
+    ]
+    for _ in range(updates):
+        for state, pair in zip(states, coordinators, strict=True):
+            if rng.random() < change_rate:
+                key = rng.choice(["feed_plan", "child_lock", "prompt_sound"])
+                state[key] = _plan(rng) if key == "feed_plan" else not state[key]
+            for coordinator in pair:
+                coordinator.async_set_updated_data(dict(state))
+    for pair in coordinators:
+        for coordinator in pair:
+            await coordinator.async_unload()
+    return counters
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--feeders", type=int, default=24)
+    parser.add_argument("--updates", type=int, default=200, help="updates per feeder")
+    parser.add_argument("--change-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    counters = asyncio.run(run(args.feeders, args.updates, args.change_rate, args.seed))
+    base = counters["unfiltered"]
+    for mode, counter in counters.items():
+        print(
+            f"{mode:<11} writes={counter.writes:<8} attr_bytes={counter.attr_bytes:<10}"
+            f" ({counter.writes / max(1, base.writes):.1%} of unfiltered writes)"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
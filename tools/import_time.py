@@ -0,0 +1,107 @@
+"""Measure the cold-import cost of the integration with ``python -X importtime``.
+
+Each run is a fresh interpreter that first imports what Home Assistant has
+already loaded before it loads this integration (core, helpers, the entity
+platforms and the bluetooth dependency, which brings bleak), then imports the integration package, its config flow and
+its platforms. Only modules first imported in that second phase are counted.
+Reports the median total over the runs, the heaviest modules, and whether the
+feeder library or the BLE stack were imported.
+
+Usage (inside a Home Assistant dev environment):
+
+    python tools/import_time.py
+    python tools/import_time.py --runs 10 --top 15
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PACKAGE = "custom_components.netizen_ble"
+MODULES = (
+    PACKAGE,
+    f"{PACKAGE}.config_flow",
+    *(
+        f"{PACKAGE}.{platform}"
+        for platform in ("binary_sensor", "button", "number", "sensor", "switch")
+    ),
+)
+# Loaded by Home Assistant before any custom integration
+PRELOAD = (
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.config_validation",
+    "homeassistant.helpers.device_registry",
+    "homeassistant.helpers.entity_platform",
+    "homeassistant.helpers.event",
+    "homeassistant.helpers.selector",
+    "homeassistant.helpers.storage",
+    "homeassistant.helpers.update_coordinator",
+    "homeassistant.components.bluetooth",
+    "homeassistant.components.binary_sensor",
+    "homeassistant.components.button",
+    "homeassistant.components.number",
+    "homeassistant.components.sensor",
+    "homeassistant.components.switch",
+)
+# Imports the integration should defer until a feeder is connected
+HEAVY = ("petnetizen_feeder", "bleak_retry_connector")
+MARKER = "-- netizen_ble --"
+
+
+def _run() -> dict[str, int]:
+    """Return self time in microseconds per module imported after the preload."""
+    script = "\n".join(
+        [
+            "import importlib, sys",
+            f"sys.path.insert(0, {str(ROOT)!r})",
+            *(f"importlib.import_module({name!r})" for name in PRELOAD),
+            f"print({MARKER!r}, file=sys.stderr, flush=True)",
+            *(f"importlib.import_module({name!r})" for name in MODULES),
+        ]
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    _, _, tail = proc.stderr.partition(MARKER)
+    modules: dict[str, int] = {}
+    for line in tail.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, _, name = line.removeprefix("import time:").split("|")
+        if self_us.strip().isdigit():
+            modules[name.strip()] = int(self_us)
+    return modules
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="heaviest modules to list")
+    args = parser.parse_args()
+
+    runs = [_run() for _ in range(args.runs)]
+    totals = [sum(run.values()) / 1000 for run in runs]
+    print(f"cold import: median {statistics.median(totals):.1f} ms over {args.runs} run(s)")
+    print(f"modules imported: {len(runs[0])}")
+
+    names = set().union(*runs)
+    median_us = {name: statistics.median(run.get(name, 0) for run in runs) for name in names}
+    for name, us in sorted(median_us.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"  {us / 1000:8.2f} ms  {name}")
+
+    pulled = sorted(name for name in runs[0] if name.split(".")[0] in HEAVY and "." not in name)
+    print(f"deferred imports loaded eagerly: {', '.join(pulled) or 'none'}")
+    return 1 if pulled else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,487 @@
+"""Deterministic load test: bursts of concurrent commands against many simulated feeders.
+
+Builds the integration's coordinators, entities and domain services for N feeders
+backed by a simulated library device (no BLE stack) and issues bursts of feed,
+child lock, prompt sound, schedule and sync-time calls through the same paths
+automations use: switch / button entity services (which skip unavailable entities)
+and the set_feed_plan service. Some
+feeders drop out of range for a while, so calls also go through the offline queue.
+
+The event loop runs on a virtual clock that jumps to the next timer whenever the
+loop is idle, so simulated link latencies, debounced refreshes and poll intervals
+cost no wall time and a seed always produces the same run. Checks:
+
+- ordering: each feeder applies every kind of command in the order it was issued
+  (skipping superseded settings is fine), ends on the last value issued, and
+  dispenses every feed exactly once
+- serialized link: no library call starts while another runs on the same feeder
+- coalescing: fire-and-forget refresh requests trigger fewer polls than requests
+- orphaned work: no tasks or integration timers are left after unload
+- bounded memory: integration allocations do not keep growing in a second round
+
+Reports throughput and per-command latency percentiles in virtual time, and a
+digest of what the feeders applied (identical across runs with the same seed).
+
+Usage (inside a Home Assistant dev environment):
+
+    python tools/load_test.py
+    python tools/load_test.py --feeders 100 --calls 40 --seed 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import logging
+import random
+import selectors
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from custom_components.netizen_ble.button import BUTTONS, NetizenBLEButton  # noqa: E402
+from custom_components.netizen_ble.const import DOMAIN  # noqa: E402
+from custom_components.netizen_ble.coordinator import NetizenBLECoordinator  # noqa: E402
+from custom_components.netizen_ble.device import NetizenBLEDevice  # noqa: E402
+from custom_components.netizen_ble.services import (  # noqa: E402
+    async_index_device,
+    async_setup_services,
+)
+from custom_components.netizen_ble.switch import SWITCHES, NetizenBLESwitch  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.helpers.service import async_register_entity_service  # noqa: E402
+from petnetizen_feeder.protocol import FeederBLEProtocol  # noqa: E402
+
+KINDS = ("feed", "child_lock", "prompt_sound", "set_feed_plan", "sync_time")
+WEIGHTS = (4, 3, 2, 3, 1)
+# Simulated link round trips (seconds): most commands, and a feed waiting for its report
+LINK_LATENCY = (0.04, 0.12)
+FEED_LATENCY = (0.3, 0.9)
+# A second round may grow integration memory by at most this much over the first
+MEMORY_SLACK = 64 * 1024
+
+
+class VirtualClockLoop(asyncio.SelectorEventLoop):
+    """Event loop whose clock jumps to the next timer instead of sleeping.
+
+    The clock stands still while executor jobs (storage reads and writes) run, so
+    how long a thread takes in real time cannot change what happens in the run.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(_InstantSelector(self))
+        self.now = 0.0
+        self.executor_jobs = 0
+
+    def time(self) -> float:
+        return self.now
+
+    def run_in_executor(self, executor: Any, func: Any, *args: Any) -> asyncio.Future[Any]:
+        future = super().run_in_executor(executor, func, *args)
+        self.executor_jobs += 1
+        future.add_done_callback(self._executor_job_done)
+        return future
+
+    def _executor_job_done(self, _future: asyncio.Future[Any]) -> None:
+        self.executor_jobs -= 1
+
+
+class _InstantSelector(selectors.DefaultSelector):
+    def __init__(self, loop: VirtualClockLoop) -> None:
+        super().__init__()
+        self._loop = loop
+
+    def select(self, timeout: float | None = None) -> list[Any]:
+        if timeout is None or (timeout > 0 and self._loop.executor_jobs):
+            return super().select(None)  # only an executor result can wake us
+        self._loop.now += timeout
+        return super().select(0)
+
+
+class SimFeeder:
+    """Stands in for petnetizen_feeder.FeederDevice with seeded link latencies."""
+
+    def __init__(self, protocol: FeederBLEProtocol, rng: random.Random) -> None:
+        # The wrapper's protocol object, so notifications pass through its tap
+        self._protocol = protocol
+        self._rng = rng
+        self.connected = True
+        self.busy = 0
+        self.overlaps = 0
+        self.polls = 0
+        self.applied: dict[str, list[Any]] = defaultdict(list)
+        self.state: dict[str, Any] = {"child_lock": False, "prompt_sound": True, "plan": []}
+
+    @property
+    def is_connected(self) -> bool:
+        return self.connected
+
+    async def _op(self, latency: tuple[float, float]) -> None:
+        if not self.connected:
+            raise RuntimeError("not connected")
+        self.overlaps += self.busy > 0
+        self.busy += 1
+        try:
+            await asyncio.sleep(self._rng.uniform(*latency))
+        finally:
+            self.busy -= 1
+
+    def _notify(self, cmd: int, payload: bytes) -> None:
+        frame = bytearray([0xEA, cmd, len(payload), *payload, 0x00, 0xAE])
+        self._protocol.notification_handler(None, frame)
+
+    async def connect(self, ble_client: Any = None) -> bool:
+        return self.connected
+
+    async def disconnect(self) -> None:
+        return None
+
+    async def get_device_info(self) -> dict[str, str]:
+        return {"device_name": "Du-W1", "device_version": "1.0"}
+
+    async def feed(self, portions: int) -> bool:
+        await self._op(FEED_LATENCY)
+        self.applied["feed"].append(portions)
+        self._notify(0x08, b"\x01")
+        self._notify(0x0C, bytes((26, 1, 1, 8, 0, len(self.applied["feed"]) % 60, portions, 1, 0)))
+        return True
+
+    async def set_child_lock(self, locked: bool) -> bool:
+        await self._op(LINK_LATENCY)
+        self.applied["child_lock"].append(locked)
+        self.state["child_lock"] = locked
+        return True
+
+    async def set_sound(self, on: bool) -> bool:
+        await self._op(LINK_LATENCY)
+        self.applied["prompt_sound"].append(on)
+        self.state["prompt_sound"] = on
+        return True
+
+    async def set_schedule(self, schedules: list[Any]) -> bool:
+        await self._op(LINK_LATENCY)
+        plan = [
+            {"weekdays": s.weekdays, "time": s.time, "portions": s.portions, "enabled": s.enabled}
+            for s in schedules
+        ]
+        self.applied["set_feed_plan"].append(plan[0]["time"] if plan else None)
+        self.state["plan"] = plan
+        return True
+
+    async def sync_time(self) -> None:
+        await self._op(LINK_LATENCY)
+        self.applied["sync_time"].append(True)
+
+    async def query_schedule(self) -> list[dict[str, Any]]:
+        await self._op(LINK_LATENCY)
+        self.polls += 1
+        return list(self.state["plan"])
+
+    async def get_child_lock_status(self) -> bool:
+        await self._op(LINK_LATENCY)
+        return self.state["child_lock"]
+
+    async def get_prompt_sound_status(self) -> bool:
+        await self._op(LINK_LATENCY)
+        return self.state["prompt_sound"]
+
+
+@dataclass
+class Feeder:
+    device_id: str
+    sim: SimFeeder
+    coordinator: NetizenBLECoordinator
+    entities: dict[str, Any]
+    issued: dict[str, list[Any]] = field(default_factory=lambda: defaultdict(list))
+    seq: int = 0
+
+
+@dataclass
+class Results:
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    refresh_requests: int = 0
+    polls: int = 0
+    overlaps: int = 0
+    failures: list[str] = field(default_factory=list)
+    memory: list[int] = field(default_factory=list)
+    virtual_seconds: float = 0.0
+    wall_seconds: float = 0.0
+    digest: str = ""
+
+
+def _is_subsequence(applied: list[Any], issued: list[Any]) -> bool:
+    remaining = iter(issued)
+    return all(value in remaining for value in applied)
+
+
+async def _entity_call(hass: HomeAssistant, entity: Any, service: str) -> None:
+    """Call an entity service as automations do: unavailable entities are skipped."""
+    await hass.services.async_call(
+        entity.entity_id.split(".")[0], service, {"entity_id": entity.entity_id}, blocking=True
+    )
+
+
+def _register_entity_services(hass: HomeAssistant, feeders: list[Feeder]) -> None:
+    """Register switch / button services the way their entity components do."""
+    for domain, services in (
+        ("switch", {"turn_on": "async_turn_on", "turn_off": "async_turn_off"}),
+        ("button", {"press": "async_press"}),
+    ):
+        entities = {
+            entity.entity_id: entity
+            for feeder in feeders
+            for entity in feeder.entities.values()
+            if entity.entity_id.startswith(f"{domain}.")
+        }
+        for name, func in services.items():
+            async_register_entity_service(
+                hass, domain, name, entities=entities, func=func, job_type=None, schema=None
+            )
+
+
+async def _call(
+    hass: HomeAssistant, feeder: Feeder, kind: str, seq: int, at: float, results: Results
+) -> None:
+    await asyncio.sleep(at)
+    entities = feeder.entities
+    started = hass.loop.time()
+    if kind == "feed":
+        portions = seq % 15 + 1
+        feeder.issued[kind].append(portions)
+        feeder.coordinator.feed_portions = portions  # as the number entity does
+        await _entity_call(hass, entities["feed_now"], "press")
+    elif kind in ("child_lock", "prompt_sound"):
+        value = seq % 2 == 0
+        feeder.issued[kind].append(value)
+        await _entity_call(hass, entities[kind], "turn_on" if value else "turn_off")
+    elif kind == "set_feed_plan":
+        slot_time = f"{seq // 60 % 24:02d}:{seq % 60:02d}"
+        feeder.issued[kind].append(slot_time)
+        schedule = [{"weekdays": "all", "time": slot_time, "portions": 1}]
+        await hass.services.async_call(
+            DOMAIN,
+            "set_feed_plan",
+            {"device_id": feeder.device_id, "schedule": schedule},
+            blocking=True,
+        )
+    else:
+        feeder.issued[kind].append(True)
+        await _entity_call(hass, entities["sync_time"], "press")
+    results.latencies[kind].append((hass.loop.time() - started) * 1000)
+    results.refresh_requests += 1
+
+
+async def _outage(sim: SimFeeder, start: float, duration: float) -> None:
+    await asyncio.sleep(start)
+    sim.connected = False
+    await asyncio.sleep(duration)
+    sim.connected = True
+
+
+async def _round(
+    hass: HomeAssistant, feeders: list[Feeder], calls: int, rng: random.Random, results: Results
+) -> None:
+    """Issue `calls` commands per feeder in bursts; some feeders drop out meanwhile."""
+    tasks = []
+    span = calls * 2.0
+    for feeder in feeders:
+        if rng.random() < 0.2:
+            tasks.append(_outage(feeder.sim, rng.uniform(0, span / 2), rng.uniform(30, 120)))
+        # Bursts: several calls for one feeder land at the same instant
+        at = 0.0
+        for _ in range(calls):
+            if rng.random() < 0.3:
+                at += rng.expovariate(0.5)
+            kind = rng.choices(KINDS, WEIGHTS)[0]
+            tasks.append(_call(hass, feeder, kind, feeder.seq, at, results))
+            feeder.seq += 1
+    await asyncio.gather(*tasks)
+    # Outages may leave commands queued: let a poll reach the feeder and flush them
+    for feeder in feeders:
+        await feeder.coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+
+def _check(feeders: list[Feeder], results: Results) -> None:
+    for feeder in feeders:
+        sim, issued = feeder.sim, feeder.issued
+        for kind in KINDS:
+            if not _is_subsequence(sim.applied[kind], issued[kind]):
+                results.failures.append(f"{feeder.device_id}: {kind} applied out of order")
+        if sorted(sim.applied["feed"]) != sorted(issued["feed"]):
+            results.failures.append(
+                f"{feeder.device_id}: {len(issued['feed'])} feeds issued,"
+                f" {len(sim.applied['feed'])} dispensed"
+            )
+        for kind in ("child_lock", "prompt_sound", "set_feed_plan"):
+            if issued[kind] and sim.applied[kind][-1:] != issued[kind][-1:]:
+                results.failures.append(f"{feeder.device_id}: {kind} did not end on the last value")
+        if feeder.coordinator.outbox.pending:
+            results.failures.append(f"{feeder.device_id}: commands left in the outbox")
+
+
+def _integration_memory() -> int:
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(True, "*custom_components/netizen_ble/*")]
+    )
+    return sum(stat.size for stat in snapshot.statistics("filename"))
+
+
+async def run(feeder_count: int, calls: int, rounds: int, seed: int) -> Results:
+    rng = random.Random(seed)
+    # The coordinator spreads poll times with the module-level generator
+    random.seed(seed)
+    results = Results()
+    hass = HomeAssistant(tempfile.mkdtemp())
+    async_setup_services(hass)
+    feeders: list[Feeder] = []
+    for index in range(feeder_count):
+        address = f"AA:BB:CC:DD:{index // 256:02X}:{index % 256:02X}"
+        device = NetizenBLEDevice(address)
+        sim = SimFeeder(device._device._protocol, random.Random(rng.random()))  # noqa: SLF001
+        device._device = sim  # noqa: SLF001
+        coordinator = NetizenBLECoordinator(hass, device)
+        # Scheduled feed windows follow the wall clock, which the virtual clock does not drive
+        coordinator._verifier.async_update_plan = lambda _plan: None  # noqa: SLF001
+        await coordinator.outbox.async_load()
+        await coordinator.async_refresh()
+        device_id = f"device-{index}"
+        coordinator.device_id = device_id
+        info: Any = {"identifiers": {(DOMAIN, address)}}
+        entities: dict[str, Any] = {
+            desc.key: NetizenBLESwitch(coordinator, info, desc, is_feed=desc.key == "manual_feed")
+            for desc in SWITCHES
+        }
+        entities.update({desc.key: NetizenBLEButton(coordinator, info, desc) for desc in BUTTONS})
+        for key, entity in entities.items():
+            entity.hass = hass
+            domain = "switch" if isinstance(entity, NetizenBLESwitch) else "button"
+            entity.entity_id = f"{domain}.feeder_{index}_{key}"
+        feeders.append(Feeder(device_id, sim, coordinator, entities))
+        async_index_device(hass, device_id, coordinator)
+        # Entities listening keep the periodic poll running, as in Home Assistant
+        coordinator.async_add_listener(lambda: None)
+
+    _register_entity_services(hass, feeders)
+
+    loop = asyncio.get_running_loop()
+    started, wall = loop.time(), time.perf_counter()
+    polls_before = sum(f.sim.polls for f in feeders)
+    digest = hashlib.sha256()
+    tracemalloc.start()
+    results.memory.append(_integration_memory())
+    for _ in range(rounds):
+        await _round(hass, feeders, calls, rng, results)
+        _check(feeders, results)
+        for feeder in feeders:
+            digest.update(repr(sorted(feeder.sim.applied.items())).encode())
+            digest.update(repr(feeder.sim.polls).encode())
+            # Only what the integration keeps should carry over into the next round
+            feeder.issued.clear()
+            feeder.sim.applied.clear()
+        results.memory.append(_integration_memory())
+    tracemalloc.stop()
+    results.virtual_seconds = loop.time() - started
+    results.wall_seconds = time.perf_counter() - wall
+    results.polls = sum(f.sim.polls for f in feeders) - polls_before
+    results.overlaps = sum(f.sim.overlaps for f in feeders)
+    if results.overlaps:
+        results.failures.append(
+            f"{results.overlaps} link operation(s) overlapped another on the same feeder"
+        )
+    results.digest = digest.hexdigest()[:16]
+    if results.polls >= results.refresh_requests:
+        results.failures.append(
+            f"{results.refresh_requests} refresh requests caused {results.polls} polls"
+            " (no coalescing)"
+        )
+
+    for feeder in feeders:
+        await feeder.coordinator.async_shutdown()
+        await feeder.coordinator.async_unload()
+    # Polls already running finish (an entry unload would cancel them) but start no new work
+    await hass.async_block_till_done(wait_background_tasks=True)
+    current = asyncio.current_task()
+    orphans = [task for task in asyncio.all_tasks() if task is not current]
+    if orphans:
+        results.failures.append(f"{len(orphans)} task(s) left after unload: {orphans[:3]}")
+    timers = [
+        handle
+        for handle in loop._scheduled  # noqa: SLF001
+        if not handle.cancelled() and "netizen_ble" in repr(handle)
+    ]
+    if timers:
+        results.failures.append(f"{len(timers)} integration timer(s) left after unload")
+    growth = [b - a for a, b in zip(results.memory, results.memory[1:], strict=False)]
+    if len(growth) > 1 and growth[-1] > max(growth[0] // 2, MEMORY_SLACK):
+        results.failures.append(f"integration memory still growing: {growth} bytes per round")
+    await hass.async_stop(force=True)
+    return results
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--feeders", type=int, default=40)
+    parser.add_argument("--calls", type=int, default=25, help="calls per feeder per round")
+    parser.add_argument("--rounds", type=int, default=2, help="2+ to check memory growth")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # Commands sent during simulated outages fail and log warnings by design
+    logging.getLogger("custom_components.netizen_ble").setLevel(logging.ERROR)
+    loop = VirtualClockLoop()
+    try:
+        results = loop.run_until_complete(run(args.feeders, args.calls, args.rounds, args.seed))
+    finally:
+        loop.close()
+
+    total = sum(len(values) for values in results.latencies.values())
+    print(
+        f"feeders={args.feeders} calls={total} virtual={results.virtual_seconds:.1f}s"
+        f" wall={results.wall_seconds:.2f}s"
+        f" throughput={total / results.virtual_seconds:.1f} calls/virtual s"
+        f" ({total / results.wall_seconds:.0f} calls/wall s)"
+    )
+    print(f"{'command':<14}{'calls':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for kind in KINDS:
+        values = results.latencies.get(kind)
+        if not values:
+            continue
+        print(
+            f"{kind:<14}{len(values):>7}{statistics.median(values):>10.0f}"
+            f"{_percentile(values, 0.95):>10.0f}{_percentile(values, 0.99):>10.0f}"
+            f"{max(values):>10.0f}"
+        )
+    requests = results.refresh_requests
+    print(
+        f"refresh requests={requests} polls={results.polls}"
+        f" ({1 - results.polls / max(1, requests):.0%} coalesced)"
+        f" overlapping link ops={results.overlaps}"
+    )
+    growth = [b - a for a, b in zip(results.memory, results.memory[1:], strict=False)]
+    print(
+        f"integration memory growth per round: {', '.join(f'{g / 1024:.1f} KiB' for g in growth)}"
+    )
+    print(f"digest={results.digest}")
+    for failure in results.failures[:10]:
+        print(f"  FAIL {failure}")
+    print("OK" if not results.failures else f"{len(results.failures)} check(s) failed")
+    return 1 if results.failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,386 @@
+"""Replay recorded or synthetic feeder frame traces through NetizenBLEDevice.
+
+Runs offline, without a BLE stack: a replay backend stands in for the
+petnetizen_feeder ``FeederDevice`` and answers the wrapper's queries from the
+frames of each trace step, decoded by the library's own protocol decoder.
+The resulting wrapper state (and coordinator data) is checked against the
+step's expectations.
+
+Trace format (JSONL, one reconciliation pass per line):
+
+    {"frames": ["EA0D010100AE", ...],       # notifications seen during the pass
+     "schedule": [...],                      # optional raw query_schedule() result
+     "expect": {"child_lock": true, ...}}    # state after the pass
+
+Usage (inside a Home Assistant dev environment):
+
+    python tools/replay.py                       # synthetic traces, all models
+    python tools/replay.py --model DU-PD01 --steps 5000
+    python tools/replay.py --trace recorded.jsonl
+    python tools/replay.py --dump-synthetic standard.jsonl --model standard
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from custom_components.netizen_ble.device import NetizenBLEDevice  # noqa: E402
+from petnetizen_feeder.protocol import FeederBLEProtocol  # noqa: E402
+
+ADDRESS = "AA:BB:CC:DD:EE:FF"
+WEEKDAY_BITS = (
+    (1, "sun"),
+    (2, "mon"),
+    (4, "tue"),
+    (8, "wed"),
+    (16, "thu"),
+    (32, "fri"),
+    (64, "sat"),
+)
+
+# Datapoints per model, from the PARITY.md real_tag tables.
+STANDARD_TAGS = tuple(range(0x00, 0x14)) + (0x17, 0x18, 0x19)
+MODELS: dict[str, dict[str, Any]] = {
+    "standard": {"tags": STANDARD_TAGS, "v2": False},
+    "DU-PD01": {"tags": STANDARD_TAGS + (0x40, 0x41), "v2": False},
+    "Du-TC02": {"tags": STANDARD_TAGS + tuple(range(0x50, 0x5A)), "v2": False},
+    "DU-F14B": {
+        "tags": (0x37, 0x27, 0x28, 0x02, 0x04, 0x05, 0x0F, 0x11, 0x0A, 0x0B, 0x03, 0x08, 0x09),
+        "v2": True,
+    },
+    "DU-CP01B": {
+        "tags": (0x37, 0x27, 0x28, 0x08, 0x09, 0x33, 0x2F, 0x30, 0x35, 0x31, 0x32, 0x34, 0x36),
+        "v2": True,
+    },
+}
+# Tags the wrapper turns into state; everything else is noise for query_status.
+# 0x09 is feed state on standard models: its frames must never set a battery level.
+STATEFUL_TAGS = (0x0D, 0x11, 0x12, 0x0E, 0x09)
+# V2 models reuse most standard tags with other meanings; 0x08 is their power mode and
+# 0x09 their battery report
+V2_STATEFUL_TAGS = (0x08, 0x09)
+
+
+def frame(cmd: int, payload: bytes = b"") -> bytes:
+    """Build an EA/AE framed notification."""
+    return bytes([0xEA, cmd, len(payload), *payload, 0x00, 0xAE])
+
+
+@dataclass
+class Step:
+    """One reconciliation pass: notifications received plus expected state."""
+
+    frames: list[bytes]
+    expect: dict[str, Any]
+    schedule: Any = None
+    has_schedule: bool = False
+
+    @classmethod
+    def from_json(cls, line: str) -> Step:
+        data = json.loads(line)
+        return cls(
+            frames=[bytes.fromhex(f) for f in data.get("frames", [])],
+            expect=data.get("expect", {}),
+            schedule=data.get("schedule"),
+            has_schedule="schedule" in data,
+        )
+
+    def to_json(self) -> str:
+        data: dict[str, Any] = {
+            "frames": [f.hex().upper() for f in self.frames],
+            "expect": self.expect,
+        }
+        if self.has_schedule:
+            data["schedule"] = self.schedule
+        return json.dumps(data)
+
+
+class ReplayFeeder:
+    """Stands in for petnetizen_feeder.FeederDevice; answers from replayed frames."""
+
+    def __init__(self, address: str) -> None:
+        self._protocol = FeederBLEProtocol(address)
+        self.frames: list[bytes] = []
+        self.schedule: Any = None
+        self.has_schedule = False
+        self.decoded = 0
+
+    @property
+    def is_connected(self) -> bool:
+        return True
+
+    def load(self, step: Step) -> None:
+        self.frames = step.frames
+        # Notifications also land in the library buffer, as from the BLE stack
+        self._protocol.received_data.extend(bytearray(f) for f in step.frames)
+        self.schedule = step.schedule
+        self.has_schedule = step.has_schedule
+
+    def _first(self, command: str, key: str) -> Any:
+        for data in self.frames:
+            self.decoded += 1
+            decoded = self._protocol.decode_notification(bytearray(data))
+            if decoded.get("command") == command and key in decoded:
+                return decoded[key]
+        return None
+
+    async def connect(self, ble_client: Any = None) -> bool:
+        return True
+
+    async def disconnect(self) -> None:
+        return None
+
+    async def get_device_info(self) -> dict[str, str]:
+        return {
+            "device_name": self._first("00", "device_name") or "",
+            "device_version": self._first("00", "device_version") or "",
+        }
+
+    async def query_schedule(self) -> Any:
+        if self.has_schedule:
+            return self.schedule
+        return self._first("11", "feed_plan_slots") or []
+
+    async def get_child_lock_status(self) -> bool | None:
+        value = self._first("0D", "child_lock")
+        return None if value is None else value == 1
+
+    async def get_prompt_sound_status(self) -> bool | None:
+        value = self._first("12", "prompt_sound")
+        return None if value is None else value == 1
+
+
+def _random_slots(rng: random.Random, strict: bool) -> tuple[bytes, list[dict[str, Any]]]:
+    payload = bytearray()
+    slots = []
+    for _ in range(rng.randint(1, 10)):
+        week = rng.randint(1, 127)
+        hour, minute = rng.randint(0, 23), rng.randint(0, 59)
+        portions, enabled = rng.randint(1, 15), rng.randint(0, 1)
+        payload += bytes([week, hour, minute, portions, enabled])
+        slots.append(
+            {
+                "weekdays": [d for bit, d in WEEKDAY_BITS if week & bit],
+                "time": f"{hour:02d}:{minute:02d}",
+                "portions": portions,
+                "enabled": bool(enabled),
+            }
+        )
+    # Some firmwares prefix the slot count. petnetizen_feeder 0.2.x mistakes an
+    # unprefixed plan whose first weekday mask is 1-15 for a prefixed one
+    # (it checks len >= 1 + 5n rather than ==); only --strict replays those.
+    ambiguous = payload[0] <= 15
+    if rng.random() < 0.5 or (ambiguous and not strict):
+        payload = bytes([len(slots)]) + payload
+    return bytes(payload), slots
+
+
+def _edge_case_step(rng: random.Random, state: dict[str, Any]) -> Step:
+    """Raw query_schedule() shapes seen in the wild: non-list, non-dict items, sparse dicts."""
+    choice = rng.randrange(4)
+    if choice == 0:
+        raw: Any = {"weekdays": ["mon"], "time": "08:00"}
+        slots: list[dict[str, Any]] = []
+    elif choice == 1:
+        raw = None
+        slots = []
+    elif choice == 2:
+        raw = ["garbage", 7, None]
+        slots = [{"weekdays": [], "time": "00:00", "portions": 1, "enabled": True}] * 3
+    else:
+        raw = [{"time": "07:30"}, {"weekdays": ["sat", "sun"], "portions": 3, "enabled": False}]
+        slots = [
+            # no weekdays means every day, as when the plan is set
+            {
+                "weekdays": [d for _, d in WEEKDAY_BITS],
+                "time": "07:30",
+                "portions": 1,
+                "enabled": True,
+            },
+            # weekdays come back in protocol bit order
+            {"weekdays": ["sun", "sat"], "time": "00:00", "portions": 3, "enabled": False},
+        ]
+    state["feed_plan_slots"] = slots
+    return Step(frames=[], expect=dict(state), schedule=raw, has_schedule=True)
+
+
+def synthesize(model: str, steps: int, seed: int, strict: bool = False) -> list[Step]:
+    """Generate a trace for a model from its PARITY.md datapoint table."""
+    rng = random.Random(seed)
+    spec = MODELS[model]
+    stateful = V2_STATEFUL_TAGS if spec["v2"] else STATEFUL_TAGS
+    noise_tags = [t for t in spec["tags"] if t not in stateful]
+    state: dict[str, Any] = {"feed_plan_slots": []}
+    trace: list[Step] = []
+    for _ in range(steps):
+        if rng.random() < 0.05:
+            trace.append(_edge_case_step(rng, state))
+            continue
+        frames = []
+        for _ in range(rng.randint(0, 4)):
+            tag = rng.choice(noise_tags)
+            # V2 0x11 is auto_lock, a single byte; longer payloads would be a real feed plan
+            size = 1 if spec["v2"] and tag == 0x11 else rng.randint(0, 12)
+            frames.append(frame(tag, rng.randbytes(size)))
+        if rng.random() < 0.05:
+            frames.append(bytes([0xEA, 0x0D]))  # truncated notification
+        if not spec["v2"]:
+            if rng.random() < 0.7:
+                payload, slots = _random_slots(rng, strict)
+                frames.append(frame(0x11, payload))
+                state["feed_plan_slots"] = slots
+            else:
+                state["feed_plan_slots"] = []
+            for tag, key in ((0x0D, "child_lock"), (0x12, "prompt_sound")):
+                if rng.random() < 0.6:
+                    value = rng.random() < 0.5
+                    frames.append(frame(tag, bytes([int(value)])))
+                    state[key] = value
+        else:
+            # V2 tags overlap standard ones with different meanings; the wrapper
+            # must not crash and must not invent state from them.
+            state["feed_plan_slots"] = []
+        if rng.random() < 0.3:
+            on_battery = rng.random() < 0.5
+            power_tag = 0x08 if spec["v2"] else 0x0E
+            frames.append(frame(power_tag, bytes([0 if on_battery else 1])))
+            state["power_mode"] = "battery" if on_battery else "dc"
+        if rng.random() < 0.3:
+            level = rng.randint(0, 100)
+            # Standard feed state frames padded to the V2 battery report's length
+            status = rng.randint(0, 2) if not spec["v2"] else 0
+            frames.append(frame(0x09, bytes([status, 0, 0, 0, 0, level])))
+            state["battery_level"] = level if spec["v2"] else None
+        rng.shuffle(frames)
+        trace.append(Step(frames=frames, expect=dict(state)))
+    return trace
+
+
+@dataclass
+class Report:
+    name: str
+    steps: int = 0
+    frames: int = 0
+    mismatches: list[str] = field(default_factory=list)
+    replay_seconds: float = 0.0
+    decode_seconds: float = 0.0
+    decoded: int = 0
+
+    def render(self) -> str:
+        passes = self.steps / self.replay_seconds if self.replay_seconds else 0.0
+        decode = self.decoded / self.decode_seconds if self.decode_seconds else 0.0
+        status = "OK" if not self.mismatches else f"{len(self.mismatches)} MISMATCH"
+        return (
+            f"{self.name:<10} steps={self.steps:<6} frames={self.frames:<7} "
+            f"passes/s={passes:>9.0f} decode frames/s={decode:>10.0f}  {status}"
+        )
+
+
+def _check(where: str, expect: dict[str, Any], get: Any, report: Report) -> None:
+    for key, value in expect.items():
+        if key == "feed_plan_slots":
+            # Traces record the attribute format; state keeps the FeedSlot tuple
+            got: Any = [slot.as_dict() for slot in get("feed_plan") or ()]
+        else:
+            got = get(key)
+        if got != value:
+            report.mismatches.append(f"{where}: {key} expected {value!r}, got {got!r}")
+
+
+async def replay(
+    name: str, trace: list[Step], with_coordinator: bool, model: str | None = None
+) -> Report:
+    report = Report(name, steps=len(trace), frames=sum(len(s.frames) for s in trace))
+    device = NetizenBLEDevice(ADDRESS)
+    backend = ReplayFeeder(ADDRESS)
+    device._device = backend  # noqa: SLF001
+    if model and model != "standard":
+        # The model decides which data points are decoded; normally read on connect
+        device._state.device_name = model  # noqa: SLF001
+
+    coordinator = None
+    if with_coordinator:
+        from custom_components.netizen_ble.coordinator import NetizenBLECoordinator
+        from homeassistant.core import HomeAssistant
+
+        hass = HomeAssistant(tempfile.mkdtemp())
+        coordinator = NetizenBLECoordinator(hass, device)
+
+    start = time.perf_counter()
+    for index, step in enumerate(trace):
+        backend.load(step)
+        await device.query_status()
+        _check(f"step {index} device", step.expect, device.get_state, report)
+        if coordinator is not None:
+            coordinator._push_state()  # noqa: SLF001 - don't wait for the push delay
+            _check(f"step {index} coordinator", step.expect, (coordinator.data or {}).get, report)
+    report.replay_seconds = time.perf_counter() - start
+
+    protocol = FeederBLEProtocol(ADDRESS)
+    frames = [bytearray(f) for s in trace for f in s.frames]
+    start = time.perf_counter()
+    for data in frames:
+        protocol.decode_notification(data)
+    report.decode_seconds = time.perf_counter() - start
+    report.decoded = len(frames)
+    if coordinator is not None:
+        await coordinator.async_unload()
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trace", type=Path, action="append", help="recorded JSONL trace")
+    parser.add_argument("--model", choices=[*MODELS, "all"], default="all")
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--strict", action="store_true", help="include frames the library is known to misdecode"
+    )
+    parser.add_argument("--device-only", action="store_true", help="skip the coordinator")
+    parser.add_argument("--dump-synthetic", type=Path, help="write the synthetic trace and exit")
+    parser.add_argument("-v", "--verbose", action="store_true", help="list every mismatch")
+    args = parser.parse_args()
+
+    # (name, model, steps); recorded traces are replayed as --model when one is given
+    traces: list[tuple[str, str | None, list[Step]]] = []
+    if args.trace:
+        model = None if args.model == "all" else args.model
+        for path in args.trace:
+            lines = path.read_text().splitlines()
+            traces.append(
+                (path.stem, model, [Step.from_json(line) for line in lines if line.strip()])
+            )
+    else:
+        models = list(MODELS) if args.model == "all" else [args.model]
+        traces = [(m, m, synthesize(m, args.steps, args.seed, args.strict)) for m in models]
+
+    if args.dump_synthetic:
+        args.dump_synthetic.write_text(
+            "".join(step.to_json() + "\n" for _, _, trace in traces for step in trace)
+        )
+        return 0
+
+    failed = False
+    for name, model, trace in traces:
+        report = asyncio.run(replay(name, trace, not args.device_only, model))
+        print(report.render())
+        for mismatch in report.mismatches[: None if args.verbose else 5]:
+            print(f"  {mismatch}")
+        failed |= bool(report.mismatches)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""Per-device state memory and notify cost, compared with the former dict layout.
+
+The current layout keeps one slotted DeviceState per feeder and hands listeners
+and the coordinator a shared read-only StateView. The dict layout it replaced is
+rebuilt here for comparison: a state dict holding the FeedSlot tuple plus a list
+of slot dicts, a merged copy kept as coordinator data, and a fresh merged copy
+for each listener on every notify.
+
+Usage (inside a Home Assistant dev environment):
+
+    python tools/state_bench.py
+    python tools/state_bench.py --devices 500 --slots 10 --listeners 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from custom_components.netizen_ble.device import NetizenBLEDevice  # noqa: E402
+from custom_components.netizen_ble.schedule import FeedSlot  # noqa: E402
+from custom_components.netizen_ble.state import DeviceState, StateView  # noqa: E402
+from homeassistant.util import dt as dt_util  # noqa: E402
+
+
+def _values(rng: random.Random, slots: int) -> dict[str, Any]:
+    plan = tuple(
+        FeedSlot(
+            weekdays=rng.randint(1, 0x7F), minute=rng.randrange(1440), portions=rng.randint(1, 15)
+        )
+        for _ in range(slots)
+    )
+    return {
+        "device_name": "Du-W1",
+        "device_version": "1.0.3",
+        "feed_plan": plan,
+        "child_lock": rng.random() < 0.5,
+        "prompt_sound": rng.random() < 0.5,
+        "power_mode": "battery",
+        "battery_level": rng.randint(0, 100),
+        "battery_low_at": dt_util.utcnow(),
+        "train_count": rng.randint(0, 500),
+    }
+
+
+def _current(values: dict[str, Any]) -> Any:
+    state = DeviceState(**values)
+    optimistic: dict[str, Any] = {}
+    return state, optimistic, StateView(state, optimistic)
+
+
+def _legacy(values: dict[str, Any]) -> Any:
+    state = dict(values)
+    state["feed_plan_slots"] = [slot.as_dict() for slot in values["feed_plan"]]
+    optimistic: dict[str, Any] = {}
+    # The coordinator kept its own merged copy as data
+    return state, optimistic, {**state, **optimistic}
+
+
+def _memory(build: Any, samples: list[dict[str, Any]]) -> float:
+    """Bytes allocated per device to hold its state (slot objects are shared, not counted)."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build(values) for values in samples]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / len(samples)
+
+
+def _legacy_notify(state: dict[str, Any], optimistic: dict[str, Any], listeners: list[Any]) -> None:
+    merged = {**state, **optimistic}
+    for cb in listeners:
+        cb(merged.copy())
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=200)
+    parser.add_argument("--slots", type=int, default=10, help="feed plan slots per device")
+    parser.add_argument("--listeners", type=int, default=2, help="coordinator + fleet totals")
+    parser.add_argument("--notifies", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    samples = [_values(rng, args.slots) for _ in range(args.devices)]
+    current = _memory(_current, samples)
+    legacy = _memory(_legacy, samples)
+    print(f"state memory per device ({args.slots} slots):")
+    print(f"  slotted state + view  {current:8.0f} B")
+    print(f"  dict layout           {legacy:8.0f} B  ({current / legacy:.0%} kept)")
+
+    listeners = [lambda _state: None for _ in range(args.listeners)]
+    device = NetizenBLEDevice("AA:BB:CC:DD:EE:FF")
+    for key, value in samples[0].items():
+        setattr(device._state, key, value)  # noqa: SLF001
+    for cb in listeners:
+        device.subscribe(cb)
+    legacy_state = _legacy(samples[0])
+    n = args.notifies
+    view_us = timeit.timeit(device._notify_listeners, number=n) / n * 1e6  # noqa: SLF001
+    dict_us = (
+        timeit.timeit(lambda: _legacy_notify(legacy_state[0], legacy_state[1], listeners), number=n)
+        / n
+        * 1e6
+    )
+    print(f"notify with {args.listeners} listener(s):")
+    print(f"  shared view           {view_us:8.2f} us")
+    print(f"  dict copies           {dict_us:8.2f} us")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())